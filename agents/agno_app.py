@@ -1,11 +1,18 @@
 import json
 import asyncio
+import functools
 import inspect
 import uuid
 import sys
 import os
+import threading
 from dotenv import load_dotenv  # <--- NEW: Import dotenv
 
+try:
+    import uvloop  # Optional: faster event loop (ships with uvicorn[standard])
+except ImportError:
+    uvloop = None
+
 # 1. Load environment variables from .env file immediately
 load_dotenv()
 
@@ -24,7 +31,53 @@ from core.data_agent import DataAgent
 from core.prompt_agent import PromptAgent
 from core.gemini_agent import GeminiAgent
 from core.schema_builder import SchemaBuilderAgent
-from core.template_selector_agent import TemplateSelectorAgent
+from core.template_selector_agent import TemplateSelectorAgent, get_template_selector_agent
+
+# --- Shared agent instances ---
+# Each agent is built lazily once and reused by every workflow. Pipeline data
+# flows through ctx.state, but GeminiAgent's agno Agent does keep session/run
+# state, so its sync run() is serialized (see _as_async), and the template
+# selector hands out copies of its cached registry entries.
+@functools.cache
+def get_data_agent() -> DataAgent:
+    return DataAgent()
+
+@functools.cache
+def get_prompt_agent() -> PromptAgent:
+    return PromptAgent()
+
+@functools.cache
+def get_gemini_agent() -> GeminiAgent:
+    return GeminiAgent()
+
+@functools.cache
+def get_schema_agent() -> SchemaBuilderAgent:
+    return SchemaBuilderAgent()
+
+@functools.cache
+def get_selector_agent() -> TemplateSelectorAgent:
+    return get_template_selector_agent()
+
+# Sync steps run on the shared agents above, and GeminiAgent's agno Agent keeps
+# session/run state, so threaded calls are serialized as they were on the loop
+_SYNC_STEP_LOCK = threading.Lock()
+
+def _as_async(step):
+    """
+    Return `step` if it is a coroutine function, else an async wrapper running
+    it in a thread, one call at a time (see _SYNC_STEP_LOCK).
+    """
+    if inspect.iscoroutinefunction(step):
+        return step
+
+    def locked_step(*args, **kwargs):
+        with _SYNC_STEP_LOCK:
+            return step(*args, **kwargs)
+
+    async def run_in_thread(*args, **kwargs):
+        return await asyncio.to_thread(locked_step, *args, **kwargs)
+
+    return run_in_thread
 
 class PortfolioBuilderWorkflow(Workflow):
     """
@@ -33,11 +86,14 @@ class PortfolioBuilderWorkflow(Workflow):
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.data_agent = DataAgent()
-        self.prompt_agent = PromptAgent()
-        self.gemini_agent = GeminiAgent()
-        self.schema_agent = SchemaBuilderAgent()
-        self.selector_agent = TemplateSelectorAgent()
+        self.data_agent = get_data_agent()
+        self.prompt_agent = get_prompt_agent()
+        self.gemini_agent = get_gemini_agent()
+        self.schema_agent = get_schema_agent()
+        self.selector_agent = get_selector_agent()
+
+        # GeminiAgent.run may be sync or async; resolve that once here rather than per run
+        self._gemini_run = _as_async(self.gemini_agent.run)
 
     async def run(self, input_data: str):
         print(f"🚀 Starting Workflow: {self.name}")
@@ -66,21 +122,19 @@ class PortfolioBuilderWorkflow(Workflow):
         # --- Step 3: LLM Generation (Sync/Async Check) ---
         print("🔄 [3/5] Running GeminiAgent (Calling LLM)...")
         
-        # Defensive check: handles both sync and async implementations of GeminiAgent
-        if inspect.iscoroutinefunction(self.gemini_agent.run):
-            await self.gemini_agent.run(ctx)
-        else:
-            self.gemini_agent.run(ctx)
+        # Sync implementations run in a worker thread so the blocking LLM call
+        # doesn't stall the event loop
+        await self._gemini_run(ctx)
 
-        # --- Step 4: Schema Building (Async) ---
+        # --- Steps 4 & 5: Schema Building + Template Selection (Async, concurrent) ---
+        # Both only read 'profile' and write their own state key ('schema' / 'template'),
+        # so they can run side by side on the same context.
         print("🔄 [4/5] Running SchemaBuilderAgent (Structuring Data)...")
-        # ✅ FIX: Added 'await' for SchemaBuilderAgent
-        await self.schema_agent.run(ctx)
-
-        # --- Step 5: Template Selection (Async) ---
         print("🔄 [5/5] Running TemplateSelectorAgent (Choosing Layout)...")
-        # ✅ FIX: Added 'await' for TemplateSelectorAgent
-        await self.selector_agent.run(ctx)
+        await asyncio.gather(
+            self.schema_agent.run(ctx),
+            self.selector_agent.run(ctx),
+        )
 
         return ctx
 
@@ -124,4 +178,7 @@ async def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
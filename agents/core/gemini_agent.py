@@ -5,6 +5,45 @@ import json
 import re
 
 
+# Characters that matter when scanning for a JSON object's extent
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+
+def _extract_json_span(text: str, start: int = 0) -> str | None:
+    """
+    Return the first balanced {...} block at or after `start`, or None.
+    Single linear pass tracking nesting depth; braces inside JSON strings
+    (including escaped quotes) are ignored, so trailing prose or code
+    fences around the object don't affect where it ends.
+    """
+    start = text.find("{", start)
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped_at = -1
+    for m in _JSON_TOKEN_RE.finditer(text, start):
+        i = m.start()
+        if i == escaped_at:
+            continue
+        ch = m.group()
+        if in_string:
+            if ch == "\\":
+                escaped_at = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
 class GeminiAgent(Agent):
     name = "gemini_agent"
 
@@ -62,18 +101,15 @@ class GeminiAgent(Agent):
         except json.JSONDecodeError:
             pass
 
-        # 2️⃣ Try fenced JSON block
-        match = re.search(
-            r"```(?:json)?\s*(\{.*?\})\s*```",
-            text,
-            re.DOTALL,
-        )
-        if match:
-            return json.loads(match.group(1))
-
-        # 3️⃣ Try first JSON object in text
-        match = re.search(r"(\{.*\})", text, re.DOTALL)
-        if match:
-            return json.loads(match.group(1))
+        # 2️⃣ Try each balanced {...} block in turn (covers fenced blocks and surrounding prose)
+        start = text.find("{")
+        while start != -1:
+            span = _extract_json_span(text, start)
+            if span is None:
+                break
+            try:
+                return json.loads(span)
+            except json.JSONDecodeError:
+                start = text.find("{", start + 1)
 
         raise ValueError("Failed to extract JSON from Gemini response")
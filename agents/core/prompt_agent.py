@@ -2,17 +2,8 @@ from agno.agent import Agent
 from agno.run import RunContext
 
 
-class PromptAgent(Agent):
-    name = "prompt_agent"
-    model = "gpt-4o-mini"  # or whatever model your project uses
-
-    async def run(self, ctx: RunContext):
-        raw_text = ctx.state.get("raw_text")
-
-        if not raw_text or not isinstance(raw_text, str):
-            raise ValueError("`raw_text` is missing or invalid in ctx.state")
-
-        prompt = f"""
+# Static instruction scaffold, built once at import; only the resume text varies per run
+_PROMPT_TEMPLATE = """
 Extract profile information and return ONLY valid JSON.
 
 Format:
@@ -35,6 +26,19 @@ Resume:
 Return ONLY the JSON object.
 """.strip()
 
+
+class PromptAgent(Agent):
+    name = "prompt_agent"
+    model = "gpt-4o-mini"  # or whatever model your project uses
+
+    async def run(self, ctx: RunContext):
+        raw_text = ctx.state.get("raw_text")
+
+        if not raw_text or not isinstance(raw_text, str):
+            raise ValueError("`raw_text` is missing or invalid in ctx.state")
+
+        prompt = _PROMPT_TEMPLATE.format(raw_text=raw_text)
+
         # store for downstream agents or LLM call
         ctx.state["prompt"] = prompt
 
@@ -5,13 +5,35 @@ Transforms parsed resume data into structured portfolio schema.
 """
 
 import logging
-from typing import Dict, Any
+import math
+import re
+from typing import Dict, Any, Optional
 from agno.agent import Agent
 from agno.run import RunContext
 
 logger = logging.getLogger(__name__)
 
 
+def _substring_pattern(*keywords: str) -> re.Pattern:
+    """One unanchored alternation: matches wherever any keyword occurs, like `kw in s`."""
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+def _coerce_positive_int(value: Any) -> Optional[int]:
+    """Return experience-style values (int, finite float, digit string) as a positive int, else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (int, float)):
+        n = int(value)
+    elif isinstance(value, str) and value.strip().isdigit():
+        n = int(value)
+    else:
+        return None
+    return n if n > 0 else None
+
+
 class SchemaBuilderAgent(Agent):
     """
     Builds portfolio schema from preprocessed profile data.
@@ -24,6 +46,12 @@ class SchemaBuilderAgent(Agent):
     """
     name = "schema_builder_agent"
 
+    # Skill category vocab, matched as substrings of each lowered skill
+    # (so "ReactJS" and "Python3" still count), one compiled scan per category
+    _LANGUAGES = _substring_pattern("python", "javascript", "java", "c++", "go", "rust")
+    _FRAMEWORKS = _substring_pattern("react", "vue", "angular", "django", "flask", "spring")
+    _TOOLS = _substring_pattern("docker", "git", "aws", "kubernetes", "jenkins")
+
     def __init__(self):
         super().__init__()
 
@@ -53,13 +81,22 @@ class SchemaBuilderAgent(Agent):
             profile.get("name", "Unknown")
         )
 
+        # Shared values are read and type-checked once, then handed to each section
+        role = profile.get("role")
+        raw_skills = profile.get("skills")
+        raw_projects = profile.get("projects")
+        skills = raw_skills if isinstance(raw_skills, list) else None
+        projects = raw_projects if isinstance(raw_projects, list) else None
+        has_projects = bool(raw_projects)
+        exp_years = _coerce_positive_int(profile.get("experience_years"))
+
         schema = {
-            "profile_summary": self._build_profile_summary(profile),
-            "hero": self._build_hero_schema(profile),
-            "bio": self._build_bio_schema(profile),
-            "projects": self._build_projects_schema(profile),
-            "skills": self._build_skills_schema(profile),
-            "layout_hints": self._build_layout_hints(profile),
+            "profile_summary": self._build_profile_summary(profile, role, skills, has_projects),
+            "hero": self._build_hero_schema(profile, role, exp_years),
+            "bio": self._build_bio_schema(role, skills, projects, exp_years),
+            "projects": self._build_projects_schema(projects),
+            "skills": self._build_skills_schema(skills),
+            "layout_hints": self._build_layout_hints(projects, has_projects, exp_years),
             "generation_flags": {
                 "hero": True,
                 "bio": True,
@@ -70,24 +107,30 @@ class SchemaBuilderAgent(Agent):
         logger.info("Schema built successfully")
         return schema
 
-    def _build_profile_summary(self, profile: dict) -> dict:
-        skills = profile.get("skills") or []
-
+    def _build_profile_summary(
+        self,
+        profile: dict,
+        role: Optional[str],
+        skills: Optional[list],
+        has_projects: bool,
+    ) -> dict:
         return {
             "name": profile.get("name"),
-            "role": profile.get("role"),
+            "role": role,
             "experience_years": profile.get("experience_years", 0),
-            "has_projects": bool(profile.get("projects")),
-            "skill_count": len(skills) if isinstance(skills, list) else 0,
+            "has_projects": has_projects,
+            "skill_count": len(skills) if skills is not None else 0,
         }
 
-    def _build_hero_schema(self, profile: dict) -> dict:
-        role = profile.get("role", "Professional")
-        exp = profile.get("experience_years", 0)
-
-        tagline = role
-        if isinstance(exp, int) and exp > 0:
-            tagline += f" with {exp}+ years experience"
+    def _build_hero_schema(
+        self,
+        profile: dict,
+        role: Optional[str],
+        exp_years: Optional[int],
+    ) -> dict:
+        tagline = role if role is not None else "Professional"
+        if exp_years:
+            tagline += f" with {exp_years}+ years experience"
 
         return {
             "name": profile.get("name", "Portfolio"),
@@ -95,22 +138,25 @@ class SchemaBuilderAgent(Agent):
             "contact": profile.get("contact", {}),
         }
 
-    def _build_bio_schema(self, profile: dict) -> dict:
+    def _build_bio_schema(
+        self,
+        role: Optional[str],
+        skills: Optional[list],
+        projects: Optional[list],
+        exp_years: Optional[int],
+    ) -> dict:
         bio_points = []
 
-        if profile.get("role"):
-            bio_points.append(f"Role: {profile['role']}")
+        if role:
+            bio_points.append(f"Role: {role}")
 
-        exp = profile.get("experience_years")
-        if isinstance(exp, (int, str)) and str(exp).isdigit() and int(exp) > 0:
-            bio_points.append(f"Experience: {exp} years")
+        if exp_years:
+            bio_points.append(f"Experience: {exp_years} years")
 
-        skills = profile.get("skills")
-        if isinstance(skills, list) and skills:
+        if skills:
             bio_points.append(f"Key skills: {', '.join(skills[:5])}")
 
-        projects = profile.get("projects")
-        if isinstance(projects, list) and projects:
+        if projects:
             bio_points.append(f"Notable projects: {len(projects)}")
 
         return {
@@ -119,10 +165,8 @@ class SchemaBuilderAgent(Agent):
             "length_hint": "medium",
         }
 
-    def _build_projects_schema(self, profile: dict) -> list:
-        projects = profile.get("projects")
-
-        if not isinstance(projects, list):
+    def _build_projects_schema(self, projects: Optional[list]) -> list:
+        if projects is None:
             return []
 
         result = []
@@ -148,10 +192,8 @@ class SchemaBuilderAgent(Agent):
 
         return result
 
-    def _build_skills_schema(self, profile: dict) -> dict:
-        skills = profile.get("skills")
-
-        if not isinstance(skills, list):
+    def _build_skills_schema(self, skills: Optional[list]) -> dict:
+        if skills is None:
             return {"raw": [], "count": 0, "categories": {}}
 
         categories = {
@@ -163,11 +205,11 @@ class SchemaBuilderAgent(Agent):
 
         for skill in skills:
             s = str(skill).lower()
-            if any(x in s for x in ["python", "javascript", "java", "c++", "go", "rust"]):
+            if self._LANGUAGES.search(s):
                 categories["languages"].append(skill)
-            elif any(x in s for x in ["react", "vue", "angular", "django", "flask", "spring"]):
+            elif self._FRAMEWORKS.search(s):
                 categories["frameworks"].append(skill)
-            elif any(x in s for x in ["docker", "git", "aws", "kubernetes", "jenkins"]):
+            elif self._TOOLS.search(s):
                 categories["tools"].append(skill)
             else:
                 categories["other"].append(skill)
@@ -178,22 +220,21 @@ class SchemaBuilderAgent(Agent):
             "categories": {k: v for k, v in categories.items() if v},
         }
 
-    def _build_layout_hints(self, profile: dict) -> dict:
+    def _build_layout_hints(
+        self,
+        projects: Optional[list],
+        has_projects: bool,
+        exp_years: Optional[int],
+    ) -> dict:
         sections = ["hero", "bio", "skills"]
 
-        if isinstance(profile.get("projects"), list) and profile["projects"]:
+        if projects:
             sections.insert(2, "projects")
 
-        exp = profile.get("experience_years", 0)
-        try:
-             exp_val = int(exp)
-        except (ValueError, TypeError):
-             exp_val = 0
-
-        density = "detailed" if exp_val >= 5 else "balanced"
+        density = "detailed" if (exp_years or 0) >= 5 else "balanced"
 
         return {
             "sections": sections,
             "density": density,
-            "emphasis": "projects" if profile.get("projects") else "skills",
+            "emphasis": "projects" if has_projects else "skills",
         }
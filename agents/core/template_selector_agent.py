@@ -1,39 +1,175 @@
 from agno.agent import Agent
 from agno.run import RunContext
+from dataclasses import dataclass
 from pathlib import Path
+import copy
+import functools
 import json
 import logging
+import re
+import sys
+
+try:
+    import orjson  # Optional: faster registry parsing
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# --- FIX 1: DYNAMIC PATH RESOLUTION (Server Safe) ---
+# Go up 3 levels to find the root folder; resolved once at import
+_DEFAULT_REGISTRY_PATH = Path(__file__).resolve().parent.parent.parent / "templates" / "registry.json"
+
+
+def _intern_strings(obj):
+    """
+    Recursively intern every dict key and string value in parsed JSON.
+    Template ids, tags and criteria keys repeat across entries, so this
+    collapses duplicates into one object each. Container types are unchanged.
+    """
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, dict):
+        return {sys.intern(k): _intern_strings(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_intern_strings(v) for v in obj]
+    return obj
+
+
+def _load_registry(registry_path: Path) -> tuple[dict, dict, "_CriteriaMatcher"]:
+    """
+    Parse registry.json once per resolved path and share it across agents.
+    Returns the full registry, a template lookup keyed by ID, and the
+    compiled role/industry matcher, so constructing another agent is O(1).
+
+    The cache is keyed on the file's mtime as well, so an edited registry is
+    re-parsed for the next agent instead of being served stale. Failures are
+    not cached, so a missing file is re-probed on the next call.
+    """
+    try:
+        mtime_ns = registry_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template registry not found at: {registry_path}") from None
+    return _parse_registry(registry_path, mtime_ns)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_registry(registry_path: Path, mtime_ns: int) -> tuple[dict, dict, "_CriteriaMatcher"]:
+    """Parse and index the registry. `mtime_ns` is only part of the cache key."""
+    raw = registry_path.read_text(encoding="utf-8")
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    registry = _intern_strings(orjson.loads(raw) if orjson else json.loads(raw))
+    templates_map = {t['id']: t for t in registry.get('templates', [])}
+
+    criteria = registry.get("selectionCriteria", {})
+    criteria_matcher = _CriteriaMatcher(criteria.get("byRole", {}), criteria.get("byIndustry", {}))
+    return registry, templates_map, criteria_matcher
+
+
+class _CriteriaMatcher:
+    """
+    Finds which criteria key (e.g. byRole's 'developer') occurs in a profile's
+    role or industry, using one compiled alternation per criteria map
+    instead of a substring test per key.
+    Each text is scanned only with its own map's pattern, so a key from one
+    map can never shadow a key from another at the same offset. Earlier maps
+    win (byRole before byIndustry), and within a map the first key listed in
+    registry.json wins, matching the original loops' priority.
+    """
+
+    def __init__(self, *criteria_maps: dict):
+        # Per map: (lowered key -> (order, original key, recommended ids), compiled pattern)
+        self._segments = []
+        for criteria in criteria_maps:
+            rules = {}
+            for order, (key, recommended_ids) in enumerate(criteria.items()):
+                rules.setdefault(sys.intern(key.lower()), (order, key, tuple(recommended_ids)))
+
+            # Lookahead so overlapping keys at different offsets are all reported
+            alternation = "|".join(re.escape(k) for k in rules)
+            pattern = re.compile(f"(?=({alternation}))") if rules else None
+            self._segments.append((rules, pattern))
+
+        # Roles/industries repeat heavily across resumes; memoize per matcher
+        # (matchers are shared by every agent on the same registry)
+        self.match = functools.lru_cache(maxsize=256)(self._match)
+
+    def _match(self, *texts: str) -> tuple[int, str, tuple] | None:
+        """Return (segment, key, recommended_ids) for the highest-priority key found."""
+        for segment, ((rules, pattern), text) in enumerate(zip(self._segments, texts)):
+            if pattern is None:
+                continue
+
+            best = min(
+                (rules[m.group(1)] for m in pattern.finditer(text)),
+                default=None,
+            )
+            if best is not None:
+                _, key, recommended_ids = best
+                return segment, key, recommended_ids
+
+        return None
+
+
+@dataclass(slots=True)
+class _ProfileView:
+    """
+    The profile fields template selection reads, extracted once per request.
+    Skills are only lowered (and cached) on first access, since most
+    profiles are decided by role or industry before skills are consulted.
+    """
+
+    role: str
+    industry: str
+    raw_skills: list
+    _skills: frozenset | None = None
+
+    @classmethod
+    def from_profile(cls, profile: dict) -> "_ProfileView":
+        return cls(
+            profile.get("role", "").lower(),
+            profile.get("industry", "").lower(),
+            profile.get("skills", []),
+        )
+
+    @property
+    def skills(self) -> frozenset:
+        if self._skills is None:
+            self._skills = frozenset(str(s).lower() for s in self.raw_skills)
+        return self._skills
+
+
 class TemplateSelectorAgent(Agent):
     name = "template_selector_agent"
 
+    # Skill keywords -> template ID, checked in order when role/industry don't match
+    _SKILL_RULES = (
+        (frozenset({"research", "publications"}), "academic-researcher"),
+        (frozenset({"figma", "design"}), "creative-bold"),
+    )
+
     def __init__(self, registry_path: str | Path | None = None):
         super().__init__()
 
-        # --- FIX 1: DYNAMIC PATH RESOLUTION (Server Safe) ---
         if registry_path is None:
-            # Go up 3 levels to find the root folder
-            base_dir = Path(__file__).resolve().parent.parent.parent
-            registry_path = base_dir / "templates" / "registry.json"
-
-        registry_path = Path(registry_path).resolve()
-
-        if not registry_path.exists():
-            raise FileNotFoundError(f"Template registry not found at: {registry_path}")
+            registry_path = _DEFAULT_REGISTRY_PATH
+        else:
+            registry_path = Path(registry_path)
+            if not registry_path.is_absolute():
+                registry_path = registry_path.resolve()
 
         try:
-            # Load the entire JSON object
-            self.full_registry = json.loads(
-                registry_path.read_text(encoding="utf-8")
-            )
-            # Create a quick lookup dictionary for templates by ID
-            self.templates_map = {t['id']: t for t in self.full_registry.get('templates', [])}
+            # Registry, ID lookup and compiled matcher are shared per path (treated as read-only)
+            self.full_registry, self.templates_map, self._criteria_matcher = _load_registry(registry_path)
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in registry file: {registry_path}") from e
 
+        # Static per registry, so resolve it once rather than on every fallback
+        self._fallback_id = self.full_registry.get("aiSelectionGuidelines", {}).get("fallback", "modern-minimal")
+        # Safety net for unknown IDs: the first template listed (None if the registry has none)
+        self._first_template = next(iter(self.templates_map.values()), None)
+
     async def run(self, ctx: RunContext):
         profile = ctx.state.get("profile")
 
@@ -52,51 +188,53 @@ class TemplateSelectorAgent(Agent):
         """
         Selects a template using the logic defined in registry.json
         """
-        # 1. Extract User Data
-        user_role = profile.get("role", "").lower()
-        user_industry = profile.get("industry", "").lower()
-        user_skills = set(s.lower() for s in profile.get("skills", []))
+        # 1. Extract User Data (skills are lowered later, only if role/industry don't match)
+        view = _ProfileView.from_profile(profile)
 
-        # 2. Get Selection Criteria from JSON
-        criteria = self.full_registry.get("selectionCriteria", {})
-        
-        # --- STRATEGY A: Check by ROLE ---
-        by_role = criteria.get("byRole", {})
-        for role_key, recommended_ids in by_role.items():
-            if role_key in user_role:
-                # Found a match! (e.g., 'developer' in 'Software Developer')
-                logger.info(f"Matched Role '{role_key}'. Suggesting: {recommended_ids[0]}")
-                return self._get_template_by_id(recommended_ids[0])
-
-        # --- STRATEGY B: Check by INDUSTRY ---
-        by_industry = criteria.get("byIndustry", {})
-        for ind_key, recommended_ids in by_industry.items():
-            if ind_key in user_industry:
-                logger.info(f"Matched Industry '{ind_key}'. Suggesting: {recommended_ids[0]}")
-                return self._get_template_by_id(recommended_ids[0])
+        # 2. Selection Criteria from JSON are precompiled in __init__
+
+        # --- STRATEGY A & B: Check by ROLE, then INDUSTRY (one scan over both) ---
+        match = self._criteria_matcher.match(view.role, view.industry)
+        if match:
+            # Found a match! (e.g., 'developer' in 'Software Developer')
+            segment, key, recommended_ids = match
+            kind = "Role" if segment == 0 else "Industry"
+            logger.info(f"Matched {kind} '{key}'. Suggesting: {recommended_ids[0]}")
+            return self._get_template_by_id(recommended_ids[0])
 
         # --- STRATEGY C: Simple Skill Keyword Matching ---
-        # If they have "research" or "publications" -> Academic
-        if "research" in user_skills or "publications" in user_skills:
-            return self._get_template_by_id("academic-researcher")
-        
-        # If they have "figma" or "photoshop" -> Creative
-        if "figma" in user_skills or "design" in user_skills:
-             return self._get_template_by_id("creative-bold")
+        # e.g. "research"/"publications" -> Academic, "figma"/"design" -> Creative
+        for keywords, template_id in self._SKILL_RULES:
+            if not view.skills.isdisjoint(keywords):
+                return self._get_template_by_id(template_id)
 
         # --- STRATEGY D: FALLBACK ---
-        # Get fallback from JSON or hardcode safety net
-        fallback_id = self.full_registry.get("aiSelectionGuidelines", {}).get("fallback", "modern-minimal")
-        logger.info(f"No specific match found. Using fallback: {fallback_id}")
+        # Fallback from JSON (or the hardcoded safety net), resolved in __init__
+        logger.info(f"No specific match found. Using fallback: {self._fallback_id}")
         
-        return self._get_template_by_id(fallback_id)
+        return self._get_template_by_id(self._fallback_id)
 
     def _get_template_by_id(self, template_id: str) -> dict:
-        """Helper to safely retrieve a template object"""
+        """
+        Helper to safely retrieve a template object.
+        Returns a copy: the registry is cached and shared by every agent, and
+        the template goes on into ctx.state where callers may modify it.
+        """
         template = self.templates_map.get(template_id)
         if template:
-            return template
+            return copy.deepcopy(template)
         
         # Absolute safety net: If the ID in the rules doesn't exist, return the first available template
+        if self._first_template is None:
+            raise ValueError(f"Template ID '{template_id}' not found and the registry has no templates")
         logger.warning(f"Template ID '{template_id}' not found in templates list. Returning first available.")
-        return list(self.templates_map.values())[0]
\ No newline at end of file
+        return copy.deepcopy(self._first_template)
+
+
+@functools.lru_cache(maxsize=8)
+def get_template_selector_agent(registry_path: str | Path | None = None) -> TemplateSelectorAgent:
+    """
+    Shared TemplateSelectorAgent per registry path.
+    Safe to reuse: per-run state lives in ctx.state, not on the agent.
+    """
+    return TemplateSelectorAgent(registry_path)
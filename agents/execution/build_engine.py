@@ -1,11 +1,18 @@
 """BUILD_ENGINE.PY - Minimal static website builder"""
 
 import os
+import html
+import asyncio
 import json
 import logging
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator
+
+try:
+    import orjson  # Optional: faster content.json serialization
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger("build_engine")
 logger.setLevel(logging.INFO)
@@ -18,111 +25,48 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
-class BuildError(Exception):
-    """Build engine error."""
-    pass
-
-
-class BuildEngine:
-    """Minimal static website builder for portfolio content."""
-
-    BUILD_DIR = "builds"
-
-    def __init__(self) -> None:
-        Path(self.BUILD_DIR).mkdir(parents=True, exist_ok=True)
-        logger.info("BuildEngine initialized")
-
-    async def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Build static portfolio website."""
-        try:
-            job = state.get("job", {})
-            content = state.get("generated_content")
-
-            if not content:
-                raise BuildError("No generated content")
-
-            job_id = job.get("job_id", "default")
-            output_dir = Path(self.BUILD_DIR) / job_id
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            # HTML
-            html = self._render_html(content)
-            (output_dir / "index.html").write_text(html, encoding="utf-8")
-
-            # CSS
-            css = self._generate_css()
-            (output_dir / "style.css").write_text(css, encoding="utf-8")
-
-            # Content snapshot
-            (output_dir / "content.json").write_text(
-                json.dumps(content, indent=2, ensure_ascii=False),
-                encoding="utf-8"
-            )
-
-            state["build"] = {
-                "output_dir": str(output_dir),
-                "entrypoint": str(output_dir / "index.html"),
-                "status": "success",
-                "generated_at": datetime.utcnow().isoformat() + "Z"
-            }
-
-            logger.info(f"✓ Build complete: {output_dir}")
-            return state
-
-        except Exception as e:
-            logger.exception("Build failed")
-            raise BuildError(f"Build failed: {e}") from e
-
-    def _render_html(self, content: Dict[str, Any]) -> str:
-        """Render semantic HTML5."""
-        hero = content.get("hero", {})
-        bio = content.get("bio", "")
-        skills = content.get("skills", [])
-        projects = content.get("projects", [])
-
-        skills_html = "".join(
-            f'<span class="skill">{self._escape(s)}</span>' for s in skills
-        )
-
-        projects_html = "".join(
-            f"<article>"
-            f"<h3>{self._escape(p.get('title', ''))}</h3>"
-            f"<p>{self._escape(p.get('description', ''))}</p>"
-            f"</article>"
-            for p in projects
-        )
-
-        return f"""<!DOCTYPE html>
+# --- Page templates ---
+# Fully static pieces are pre-encoded bytes; the str templates only wrap
+# the escaped fields and are encoded per chunk in _iter_html.
+_DOC_START = b"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>{self._escape(hero.get('name', 'Portfolio'))}</title>
+  <title>"""
+
+_HERO_HTML = """{title}</title>
   <link rel="stylesheet" href="style.css">
 </head>
 <body>
   <div class="container">
     <header class="hero">
-      <h1>{self._escape(hero.get('name', ''))}</h1>
-      <p>{self._escape(hero.get('tagline', ''))}</p>
+      <h1>{name}</h1>
+      <p>{tagline}</p>
     </header>
 
-    {f"<section><h2>About</h2><p>{self._escape(bio)}</p></section>" if bio else ""}
+    """
 
-    {f"<section><h2>Skills</h2><div class='skills'>{skills_html}</div></section>" if skills else ""}
-
-    {f"<section><h2>Projects</h2><div class='projects'>{projects_html}</div></section>" if projects else ""}
+_FOOTER_HTML = """
 
     <footer>
-      <p>Generated by Showcase AI • {datetime.utcnow().strftime("%Y-%m-%d")}</p>
+      <p>Generated by Showcase AI • {date}"""
+
+_DOC_END = b"""</p>
     </footer>
   </div>
 </body>
 </html>"""
 
-    def _generate_css(self) -> str:
-        """Generate minimal responsive CSS."""
-        return """
+_SECTION_GAP = b"\n\n    "
+_SECTION_CLOSE = b"</div></section>"
+_SKILLS_OPEN = b"<section><h2>Skills</h2><div class='skills'>"
+_PROJECTS_OPEN = b"<section><h2>Projects</h2><div class='projects'>"
+_ABOUT_HTML = "<section><h2>About</h2><p>{bio}</p></section>"
+_SKILL_HTML = '<span class="skill">{skill}</span>'
+_PROJECT_HTML = "<article><h3>{title}</h3><p>{description}</p></article>"
+
+_CSS = """
 * { margin: 0; padding: 0; box-sizing: border-box; }
 body {
   font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
@@ -174,15 +118,116 @@ footer { text-align: center; padding: 20px; color: #999; }
   .projects { grid-template-columns: 1fr; }
 }
 """
+_CSS_BYTES = _CSS.encode("utf-8")  # static, so encoded once for every build
+
+
+class BuildError(Exception):
+    """Build engine error."""
+    pass
+
+
+class BuildEngine:
+    """Minimal static website builder for portfolio content."""
+
+    BUILD_DIR = "builds"
+
+    def __init__(self) -> None:
+        Path(self.BUILD_DIR).mkdir(parents=True, exist_ok=True)
+        logger.info("BuildEngine initialized")
+
+    async def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Build static portfolio website."""
+        try:
+            job = state.get("job", {})
+            content = state.get("generated_content")
+
+            if not content:
+                raise BuildError("No generated content")
+
+            job_id = job.get("job_id", "default")
+            output_dir = Path(self.BUILD_DIR) / job_id
+            # Disk I/O runs in worker threads so concurrent builds don't block the event loop
+            await asyncio.to_thread(output_dir.mkdir, parents=True, exist_ok=True)
+            await asyncio.gather(
+                asyncio.to_thread(self._write_html, output_dir / "index.html", content),
+                asyncio.to_thread((output_dir / "style.css").write_bytes, _CSS_BYTES),
+                asyncio.to_thread(self._write_content, output_dir / "content.json", content),
+            )
+
+            state["build"] = {
+                "output_dir": str(output_dir),
+                "entrypoint": str(output_dir / "index.html"),
+                "status": "success",
+                "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            }
+
+            logger.info(f"✓ Build complete: {output_dir}")
+            return state
+
+        except Exception as e:
+            logger.exception("Build failed")
+            raise BuildError(f"Build failed: {e}") from e
+
+    def _write_html(self, path: Path, content: Dict[str, Any]) -> None:
+        """Stream the rendered page through a buffered binary writer, chunk by chunk."""
+        with open(path, "wb", buffering=1 << 16) as f:
+            f.writelines(self._iter_html(content))
+
+    @staticmethod
+    def _write_content(path: Path, content: Dict[str, Any]) -> None:
+        """Write the content snapshot (orjson bytes when available)."""
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(content, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            path.write_text(json.dumps(content, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    def _render_html(self, content: Dict[str, Any]) -> str:
+        """Render semantic HTML5."""
+        return b"".join(self._iter_html(content)).decode("utf-8")
+
+    def _iter_html(self, content: Dict[str, Any]) -> Iterator[bytes]:
+        """Yield the UTF-8 HTML document in chunks, so it can be written without building one big string."""
+        hero = content.get("hero", {})
+        bio = content.get("bio", "")
+        skills = content.get("skills", [])
+        projects = content.get("projects", [])
+        escape = self._escape
+
+        yield _DOC_START
+        yield _HERO_HTML.format(
+            title=escape(hero.get("name", "Portfolio")),
+            name=escape(hero.get("name", "")),
+            tagline=escape(hero.get("tagline", "")),
+        ).encode("utf-8")
+
+        if bio:
+            yield _ABOUT_HTML.format(bio=escape(bio)).encode("utf-8")
+        yield _SECTION_GAP
+
+        if skills:
+            yield _SKILLS_OPEN
+            for s in skills:
+                yield _SKILL_HTML.format(skill=escape(s)).encode("utf-8")
+            yield _SECTION_CLOSE
+        yield _SECTION_GAP
+
+        if projects:
+            yield _PROJECTS_OPEN
+            for p in projects:
+                yield _PROJECT_HTML.format(
+                    title=escape(p.get("title", "")),
+                    description=escape(p.get("description", "")),
+                ).encode("utf-8")
+            yield _SECTION_CLOSE
+
+        yield _FOOTER_HTML.format(date=datetime.now(timezone.utc).strftime("%Y-%m-%d")).encode("utf-8")
+        yield _DOC_END
+
+    def _generate_css(self) -> str:
+        """Generate minimal responsive CSS."""
+        return _CSS
 
     @staticmethod
     def _escape(text: str) -> str:
         """Escape HTML special characters."""
-        return (
-            str(text or "")
-            .replace("&", "&amp;")
-            .replace("<", "&lt;")
-            .replace(">", "&gt;")
-            .replace('"', "&quot;")
-            .replace("'", "&#39;")
-        )
+        return html.escape(str(text or ""))
@@ -8,11 +8,18 @@ Deploy Handler: Deploy built portfolio to hosting
 
 import os
 import uuid
+import asyncio
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from pathlib import Path
 from typing import Dict, Any
 
+try:
+    import orjson  # Optional: faster resume.json serialization
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("handlers")
 logger.setLevel(logging.INFO)
 
@@ -22,6 +29,11 @@ if not logger.handlers:
     logger.addHandler(handler)
 
 
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with second precision, e.g. 2024-01-01T12:00:00Z."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 # Upload Handler
 class UploadHandler:
     """Handles file upload persistence and job creation."""
@@ -47,18 +59,17 @@ class UploadHandler:
                 raise ValueError("No resume data provided")
             
             # Create job
-            job_id = str(uuid.uuid4())
+            # Only used as a directory name, so the unhyphenated hex form is enough
+            job_id = uuid.uuid4().hex
             job_dir = os.path.join(self.base_path, job_id)
-            os.makedirs(job_dir, exist_ok=True)
-            
-            # Save raw input
             resume_path = os.path.join(job_dir, "resume.json")
-            with open(resume_path, "w", encoding="utf-8") as f:
-                json.dump(resume_data, f, indent=2)
+
+            # Save raw input off the event loop
+            await asyncio.to_thread(self._save_resume, job_dir, resume_path, resume_data)
             
             state["job"] = {
                 "job_id": job_id,
-                "created_at": datetime.utcnow().isoformat() + "Z",
+                "created_at": _utc_timestamp(),
                 "job_dir": job_dir,
                 "resume_path": resume_path
             }
@@ -70,6 +81,19 @@ class UploadHandler:
             logger.error(f"Upload failed: {str(e)}")
             raise
 
+    @staticmethod
+    def _save_resume(job_dir: str, resume_path: str, resume_data: Any) -> None:
+        """Create the job directory and write resume.json (blocking)."""
+        os.makedirs(job_dir, exist_ok=True)
+        if orjson is not None:
+            # Serialized up front, then handed to the OS in one write
+            Path(resume_path).write_bytes(
+                orjson.dumps(resume_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+        else:
+            # json.dumps + one write instead of json.dump's many small chunk writes
+            Path(resume_path).write_text(json.dumps(resume_data, indent=2), encoding="utf-8")
+
 
 # Deploy Handler
 class DeployHandler:
@@ -116,7 +140,7 @@ class DeployHandler:
                 "status": "success",
                 "url": url,
                 "provider": self.provider,
-                "deployed_at": datetime.utcnow().isoformat() + "Z"
+                "deployed_at": _utc_timestamp()
             }
             
             logger.info(f"✓ Deployed to {self.provider}: {url}")
@@ -29,31 +29,51 @@ NOTE: THIS CODE IS AI GENERATED, YOUR WORK IS TO ANALYSIS THE CODE AND CHECK THE
 """
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import timedelta
 import json
 import os
+import random
+import re
+import contextlib
 import hashlib
+import heapq
+import time
+import weakref
+import functools
 from functools import wraps
 
 # Google Generative AI (new google.genai package)
 try:
     import google.genai as genai
+    from google.genai import errors as genai_errors
     from google.genai import types
 except ImportError:
     raise ImportError(
         "google-genai not installed. Install with: pip install google-genai"
     )
 
+import httpx  # Installed with google-genai
+
+try:
+    import orjson  # Optional: faster response parsing and cache-key encoding
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # Optional: enables HTTP/2 on the shared Gemini connection pool
+except ImportError:
+    h2 = None
+
 # Retry logic
 try:
     from tenacity import (
         retry,
-        stop_after_attempt,
         wait_exponential,
         retry_if_exception_type,
+        retry_if_not_exception_type,
         before_sleep_log
     )
 except ImportError:
@@ -71,35 +91,863 @@ class GenerationError(Exception):
 
 class RateLimitError(GenerationError):
     """Raised when API rate limit is exceeded."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        # Server-suggested delay in seconds, when the 429 carried one
+        self.retry_after = retry_after
+
+
+class RequestRejectedError(GenerationError):
+    """Raised when the API rejects a request as invalid (4xx); retrying won't help."""
     pass
 
 
 class ContentValidationError(GenerationError):
     """Raised when generated content fails validation."""
-    pass
+    
+    def __init__(self, message: str, content: Any = None):
+        super().__init__(message)
+        # The rejected content, for callers that can still fall back to it
+        self.content = content
 
-import os
-import json
-import asyncio
-from datetime import datetime
-from typing import Dict, Any, List
 
-import google.generativeai as genai
-from pydantic import ValidationError
+class ToneStyle(str, Enum):
+    """Writing tone requested through preferences['tone']."""
+    PROFESSIONAL = "professional"
+    CASUAL = "casual"
+    CREATIVE = "creative"
+    FORMAL = "formal"
+
+
+class EmphasisType(str, Enum):
+    """Project aspect requested through preferences['emphasis']."""
+    TECHNICAL = "technical"
+    BUSINESS = "business"
+    IMPACT = "impact"
+    CREATIVE = "creative"
+
+
+@dataclass
+class GenerationConfig:
+    """Model, validation and throughput settings for GenerationAgent."""
+    model_name: str = "gemini-2.5-flash"
+    temperature: float = 0.7
+    top_p: float = 0.95
+    top_k: int = 40
+    max_output_tokens: int = 2048
+    block_none_harmful: bool = True
+    max_retries: int = 3
+    generation_timeout: float = 30.0
+    requests_per_minute: int = 60
+    tokens_per_minute: Optional[int] = None    # No TPM pacing unless set
+    max_concurrent_requests: Optional[int] = 8
+    use_batch_api: bool = False
+    batch_poll_interval: float = 30.0
+    enable_cache: bool = True
+    cache_ttl: int = 3600
+    hero_min_words: int = 5
+    hero_max_words: int = 15
+    
+    def __post_init__(self):
+        # Checked here too so a bad limit fails when the agent is built, not on its first call
+        _check_rate_limits(self.requests_per_minute, self.tokens_per_minute)
+
+
+def _check_rate_limits(requests_per_minute: int, tokens_per_minute: Optional[int]) -> None:
+    """Reject limits a RateLimiter can't pace by (zero or negative rates)."""
+    if requests_per_minute <= 0:
+        raise ValueError(f"requests_per_minute must be positive, got {requests_per_minute}")
+    if tokens_per_minute is not None and tokens_per_minute <= 0:
+        raise ValueError(f"tokens_per_minute must be positive or None, got {tokens_per_minute}")
+
+
+_SAFETY_CATEGORIES = (
+    types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+    types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+    types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+    types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_generate_config(
+    temperature: float,
+    top_p: float,
+    top_k: int,
+    max_output_tokens: int,
+    block_harmful: bool,
+    json_output: bool = False
+) -> types.GenerateContentConfig:
+    """
+    Build the request config (with safety settings) once per distinct setting.
+    Agents with the same settings share the returned object, so treat it as read-only.
+    """
+    threshold = (
+        types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE if block_harmful
+        else types.HarmBlockThreshold.BLOCK_NONE
+    )
+    return types.GenerateContentConfig(
+        temperature=temperature,
+        top_p=top_p,
+        top_k=top_k,
+        max_output_tokens=max_output_tokens,
+        safety_settings=[
+            types.SafetySetting(category=category, threshold=threshold)
+            for category in _SAFETY_CATEGORIES
+        ],
+        response_mime_type='application/json' if json_output else None,
+    )
+
+
+def _stop_after_config_retries(retry_state) -> bool:
+    """Stop once the agent's configured max_retries attempts have been made."""
+    agent = retry_state.args[0]
+    return retry_state.attempt_number >= agent.config.max_retries
+
+
+_MAX_RETRY_AFTER = 60.0
+_backoff = wait_exponential(multiplier=1, min=1, max=10)
+
+
+def _wait_before_retry(retry_state) -> float:
+    """The server's delay for a rate limit when it sent one, else exponential backoff; plus jitter."""
+    delay = getattr(retry_state.outcome.exception(), 'retry_after', None)
+    if delay is None:
+        delay = _backoff(retry_state)
+    return min(delay, _MAX_RETRY_AFTER) + random.uniform(0, 0.5)
+
+
+def _retry_after(error: "genai_errors.APIError") -> Optional[float]:
+    """Delay a 429 asks for: the Retry-After header, else google.rpc.RetryInfo's retryDelay ('34s')."""
+    headers = getattr(error.response, 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if value is None and isinstance(error.details, dict):
+        for detail in error.details.get('error', {}).get('details', []):
+            if isinstance(detail, dict) and detail.get('@type', '').endswith('RetryInfo'):
+                value = str(detail.get('retryDelay', '')).rstrip('s')
+                break
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to backoff
+
+
+# Single retry policy for every Gemini-backed step: transient generation errors,
+# timeouts, rate limits and failed validation are retried; requests the API
+# rejected as invalid are not
+_retry_generation = retry(
+    retry=(
+        retry_if_exception_type((GenerationError, asyncio.TimeoutError))
+        & retry_if_not_exception_type(RequestRejectedError)
+    ),
+    stop=_stop_after_config_retries,
+    wait=_wait_before_retry,
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+# For the combined request: only rate limits are worth repeating it for,
+# since anything else it misses is covered by the per-section fallback
+_retry_rate_limited = retry(
+    retry=retry_if_exception_type(RateLimitError),
+    stop=_stop_after_config_retries,
+    wait=_wait_before_retry,
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+
+
+def _normalize_text(text: str) -> str:
+    """Casefold and collapse whitespace, for building cache keys."""
+    return ' '.join(str(text or '').casefold().split())
+
+
+# Model preambles stripped from the start of responses (first alternative wins)
+_TAGLINE_PREAMBLE_RE = re.compile(
+    r"(?:here is the tagline:|here is:|tagline:|the tagline is:)", re.IGNORECASE
+)
+# Words a trimmed tagline shouldn't be left ending on
+_TAGLINE_DANGLING_WORDS = frozenset({'a', 'an', 'and', 'at', 'for', 'in', 'of', 'or', 'the', 'to', 'with', '&', '-', '|'})
+_BIO_PREAMBLE_RE = re.compile(
+    r"(?:here is the bio:|here is:|bio:|the bio is:|here's the bio:)", re.IGNORECASE
+)
+_DESCRIPTION_PREAMBLE_RE = re.compile(
+    r"(?:here is the enhanced description:|here is:|enhanced description:|the description is:)",
+    re.IGNORECASE
+)
+
+
+def _strip_preamble(text: str, pattern: re.Pattern) -> str:
+    """Drop a leading preamble matched by `pattern`, then surrounding whitespace."""
+    match = pattern.match(text)
+    return text[match.end():].strip() if match else text
+
+
+# Deletes markdown emphasis markers ('*' and '**') in a single translate pass
+_MARKDOWN_EMPHASIS_TABLE = str.maketrans('', '', '*')
+
+
+def _collapse_prose(text: str) -> str:
+    """Strip markdown emphasis and collapse runs of whitespace to single spaces."""
+    # split()/join is already a single C-level pass, cheaper than a regex sub
+    return ' '.join(text.translate(_MARKDOWN_EMPHASIS_TABLE).split())
+
+
+# Refusals show up in the opening tokens of a response, so only that much is scanned
+_REFUSAL_RE = re.compile(
+    r"\s*(?:I'm sorry|I am sorry|I'm unable|I am unable|I can(?:not|'t) (?:help|assist|comply)|As an AI)",
+    re.IGNORECASE
+)
+_REFUSAL_SCAN_CHARS = 120
+
+
+def _ends_like_json(chunks: List[str]) -> bool:
+    """True if the last non-whitespace character across `chunks` closes a JSON value."""
+    for text in reversed(chunks):
+        text = text.rstrip()
+        if text:
+            return text[-1] in '}]'
+    return False
+
+
+class RateLimiter:
+    """
+    Async token buckets pacing Gemini calls to `requests_per_minute` and,
+    optionally, `tokens_per_minute`, plus a cap on calls in flight.
+    
+    Both buckets refill continuously from the monotonic clock, so acquire()
+    is O(1): take from both if they can cover the call, otherwise sleep
+    exactly until they will. Throttling up front is cheaper than eating a
+    429 and a backoff. The lock keeps concurrent callers (e.g. the gather()
+    fan-out in generate()) from overdrawing the buckets, and is released
+    while sleeping.
+    
+    The concurrency cap adapts AIMD-style: a call ending in RateLimitError
+    halves it, each successful call grows it by one, up to max_concurrent.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        burst: Optional[int] = None
+    ):
+        _check_rate_limits(requests_per_minute, tokens_per_minute)
+        self.capacity = float(burst or requests_per_minute)
+        self.refill_rate = requests_per_minute / 60.0    # requests per second
+        self._tokens = self.capacity
+        
+        # Model tokens (prompt + output), tracked only when a TPM budget is set
+        self.token_capacity = float(tokens_per_minute) if tokens_per_minute is not None else None
+        self.token_refill_rate = (tokens_per_minute or 0) / 60.0
+        self._model_tokens = self.token_capacity or 0.0
+        
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.max_concurrent = max_concurrent
+        self._concurrency = max_concurrent    # current AIMD limit
+        self._active = 0
+        self._slot_free = asyncio.Condition()
+    
+    async def acquire(self, cost: float = 1.0, tokens: int = 0) -> None:
+        # A call larger than the whole TPM budget waits for a full bucket, not forever
+        tokens = min(tokens, self.token_capacity) if self.token_capacity else 0
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._last_refill
+                self._last_refill = now
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_rate)
+                if self.token_capacity:
+                    self._model_tokens = min(
+                        self.token_capacity,
+                        self._model_tokens + elapsed * self.token_refill_rate
+                    )
+                
+                if self._tokens >= cost and self._model_tokens >= tokens:
+                    self._tokens -= cost
+                    self._model_tokens -= tokens
+                    return
+                
+                wait = max(
+                    (cost - self._tokens) / self.refill_rate,
+                    (tokens - self._model_tokens) / self.token_refill_rate if tokens else 0.0
+                )
+            
+            await asyncio.sleep(wait)
+    
+    @contextlib.asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """Pace one call, then hold a concurrency slot for its duration."""
+        await self.acquire(tokens=tokens)
+        if not self.max_concurrent:
+            yield
+            return
+        
+        async with self._slot_free:
+            await self._slot_free.wait_for(lambda: self._active < self._concurrency)
+            self._active += 1
+        try:
+            yield
+        except RateLimitError:
+            self._concurrency = max(1, self._concurrency // 2)
+            raise
+        else:
+            self._concurrency = min(self.max_concurrent, self._concurrency + 1)
+        finally:
+            self._active -= 1
+            async with self._slot_free:
+                self._slot_free.notify_all()
+
+
+# Shared per event loop (asyncio primitives can't cross loops), then per limits
+_shared_rate_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, RateLimiter]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_rate_limiter(
+    requests_per_minute: int,
+    tokens_per_minute: Optional[int],
+    max_concurrent: Optional[int]
+) -> RateLimiter:
+    """The RateLimiter every agent with these limits uses on the running loop."""
+    limiters = _shared_rate_limiters.setdefault(asyncio.get_running_loop(), {})
+    key = (requests_per_minute, tokens_per_minute, max_concurrent)
+    limiter = limiters.get(key)
+    if limiter is None:
+        limiter = limiters[key] = RateLimiter(*key)
+    return limiter
+
+
+# Pooled keep-alive HTTP clients, shared per event loop (an httpx.AsyncClient's
+# connections belong to the loop that opened them), then per timeout
+_shared_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[float, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_http_client(timeout: float) -> httpx.AsyncClient:
+    """The open HTTP client every agent with this timeout uses on the running loop."""
+    clients = _shared_http_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(timeout)
+    if client is None or client.is_closed:
+        # genai never closes a client it was handed; see close_http_clients()
+        client = clients[timeout] = httpx.AsyncClient(
+            http2=h2 is not None,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=timeout,
+        )
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the running loop's pooled Gemini connections (call on shutdown)."""
+    clients = _shared_http_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+class _SingleFlight:
+    """
+    At most one call per key in flight: callers arriving while a key's call
+    is running await that call's outcome (value or exception) instead of
+    starting a duplicate. Nothing is kept once the call finishes. If the
+    running call is cancelled, its waiters start the call again themselves.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+    
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        while (pending := self._calls.get(key)) is not None:
+            try:
+                # Shielded so a cancelled waiter doesn't cancel the shared call
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # This waiter was cancelled, not the shared call
+        
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            value = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: there may be no waiters
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._calls.pop(key, None)
+
+
+class ContentValidator:
+    """
+    Cheap local checks on generated sections, run before they are accepted.
+    Rejects empty output, refusals, leftover placeholders and lengths far
+    outside what the prompts ask for; tone and quality are left to the model.
+    """
+    
+    # Word-count bounds are looser than the prompted ranges, so near misses pass
+    BIO_WORDS = (40, 320)
+    PROJECT_WORDS = (20, 220)
+    
+    _PLACEHOLDER_RE = re.compile(r"\[[^\[\]\n]*\]|\{\{|lorem ipsum", re.IGNORECASE)
+    
+    def _is_clean(self, text: str) -> bool:
+        return (
+            isinstance(text, str)
+            and bool(text.strip())
+            and not _REFUSAL_RE.match(text)
+            and not self._PLACEHOLDER_RE.search(text)
+        )
+    
+    def validate_hero_tagline(self, tagline: str, config: GenerationConfig) -> bool:
+        """A single line within the configured word limits."""
+        if not self._is_clean(tagline) or '\n' in tagline.strip():
+            return False
+        return config.hero_min_words <= len(tagline.split()) <= config.hero_max_words
+    
+    def validate_bio(self, bio: str, config: GenerationConfig) -> bool:
+        """Prose within BIO_WORDS."""
+        if not self._is_clean(bio):
+            return False
+        low, high = self.BIO_WORDS
+        return low <= len(bio.split()) <= high
+    
+    def validate_project_description(self, description: str, config: GenerationConfig) -> bool:
+        """Prose within PROJECT_WORDS."""
+        if not self._is_clean(description):
+            return False
+        low, high = self.PROJECT_WORDS
+        return low <= len(description.split()) <= high
+
+
+class ContentCache:
+    """
+    In-memory exact-match cache for generated content.
+    
+    Keys are blake2b digests of a canonical JSON encoding of the inputs, so
+    equal inputs always map to the same short key. Entries expire `ttl`
+    seconds after being set; expiry times live in a min-heap and are
+    evicted lazily on access, so no background task is needed.
+    
+    get_or_create() also coalesces concurrent misses: while one caller is
+    generating a key, later callers await its result instead of issuing
+    a duplicate request.
+    """
+    
+    def __init__(self, ttl: Union[int, float, timedelta] = 3600):
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self._entries: Dict[str, tuple] = {}    # key -> (value, expires_at)
+        self._expiry_heap: List[tuple] = []     # (expires_at, key)
+        self._inflight = _SingleFlight()
+        self._hits = 0
+        self._misses = 0
+    
+    @staticmethod
+    def _generate_key(*parts: Any) -> str:
+        """Stable digest of the key parts (tuples and lists encode identically)."""
+        if orjson is not None:
+            payload = orjson.dumps(
+                parts, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            )
+        else:
+            payload = json.dumps(
+                parts, sort_keys=True, separators=(',', ':'), default=str
+            ).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _evict_expired(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Ignore heap records superseded by a later set() of the same key
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+    
+    async def get(self, key: str) -> Optional[Any]:
+        self._evict_expired(time.monotonic())
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return entry[0]
+    
+    async def set(self, key: str, value: Any) -> None:
+        now = time.monotonic()
+        self._evict_expired(now)
+        expires_at = now + self.ttl
+        self._entries[key] = (value, expires_at)
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+    
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for `key`, or await `factory()` and cache its result.
+        
+        Callers arriving while the same key is being generated share that
+        generation's outcome (value or exception). Failures are not cached.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+        
+        async def create() -> Any:
+            value = await factory()
+            await self.set(key, value)
+            return value
+        
+        return await self._inflight.run(key, create)
+    
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._expiry_heap.clear()
+    
+    async def get_stats(self) -> Dict[str, Any]:
+        self._evict_expired(time.monotonic())
+        return {
+            'size': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'ttl_seconds': self.ttl
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class _GenerationContext:
+    """
+    The user-data fields the prompts and cache keys read, extracted once per
+    generate() call and shared by every section instead of re-sliced per call.
+    """
+    
+    name: str
+    domain: str
+    skills: tuple          # First 8 skills, as prompt-ready strings
+    project_count: int
+    
+    @classmethod
+    def from_inputs(cls, user_data: Dict[str, Any], domain: str) -> "_GenerationContext":
+        return cls(
+            name=user_data.get('name', 'Professional'),
+            domain=domain,
+            skills=tuple(str(s) for s in user_data.get('skills', [])[:8]),
+            project_count=len(user_data.get('projects', [])),
+        )
+    
+    @property
+    def top_skills(self) -> tuple:
+        return self.skills[:5]
+
+
+@dataclass(frozen=True, slots=True)
+class _RegenerationContext:
+    """
+    The regenerate_section() context fields the regeneration prompts read,
+    extracted once per request instead of through nested .get() chains.
+    """
+    
+    name: Optional[str]
+    title: Optional[str]
+    email: Optional[str]
+    skills: tuple          # As prompt-ready strings
+    current: Any           # The section's current content (hero/project dict, or bio text)
+    
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> "_RegenerationContext":
+        profile = context.get('user_profile') or {}
+        return cls(
+            name=profile.get('name'),
+            title=profile.get('title'),
+            email=profile.get('email'),
+            skills=tuple(str(s) for s in profile.get('skills', [])),
+            current=context.get('current_content'),
+        )
+
+
+def _compact_json(obj: Any) -> str:
+    """Serialize for a prompt without indentation (same content, fewer tokens)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+# Shared decoder for locating JSON values inside model output
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Batch job states after which polling stops
+_BATCH_DONE_STATES = frozenset({
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_PARTIALLY_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
+})
+
+
+# --- Prompt templates ---
+# Each prompt is a fixed instruction block followed by the per-request context.
+# Keeping everything that varies at the tail lets Gemini's implicit prefix
+# caching reuse the shared head across requests.
+
+_COMBINED_PROMPT_PREFIX = """You are a portfolio content generator. Write the hero tagline, the "About" bio and the enhanced project descriptions for a professional portfolio in a single response.
+
+Output ONLY valid JSON with exactly this shape:
+{"tagline": string, "bio": string, "projects": [{"id": string, "description": string}]}
+
+Tagline:
+- 6-18 words, specific to the person's domain and strongest skills
+Bio:
+- 150-200 words in 2-3 short paragraphs, written in the first person ("I", "my")
+- Expand the key points into natural prose; do not list them
+Projects:
+- One entry per project given below, keeping its id
+- Respect each project's word_count
+- Highlight the problem solved, the solution, and the technologies used
+- Use active, strong verbs (built, developed, implemented, designed)
+
+Rules for every section:
+- Do NOT invent experience, metrics, employers, or facts
+- Stay truthful to the original descriptions
+- NO clichés ("passionate", "innovative", etc.), markdown, or introductory phrases
+
+"""
+
+_COMBINED_PROMPT_CONTEXT = """Context:
+- Domain: {domain}
+- Desired tone: {tone}
+- Emphasize: {emphasis} aspects
+- Name: {name}
+- Skills: {skills}
+Key points:
+{key_points}
+Projects (JSON):
+{projects}"""
+
+_HERO_PROMPT_PREFIX = """You are a portfolio content generator. Write a compelling hero tagline for a professional portfolio.
+
+Requirements:
+- 6-18 words
+- Specific to the person's domain and strongest skills
+- Use active, confident language
+- NO clichés ("passionate", "innovative", "guru", etc.)
+- Do NOT invent experience, metrics, or facts
+- NO introductory phrases like "Here is" or "Tagline:"
+
+Return ONLY the tagline text, nothing else.
+
+"""
+
+_HERO_PROMPT_CONTEXT = """Context:
+- Domain: {domain}
+- Desired tone: {tone}
+- Number of projects: {project_count}
+- Name: {name}
+- Top Skills: {skills}"""
+
+_BIO_PROMPT_PREFIX = """You are a portfolio content generator. Write the "About" bio for a professional portfolio.
+
+Requirements:
+- 150-200 words, in 2-3 short paragraphs
+- Write in the first person ("I", "my")
+- Expand the key points into natural prose; do not list them
+- Professional, confident, human; action-oriented language
+- NO clichés ("passionate", "innovative", etc.)
+- Do NOT invent experience, metrics, employers, or facts
+- NO markdown and NO introductory phrases like "Here is the bio"
+
+Return ONLY the bio text.
+
+"""
+
+_BIO_PROMPT_CONTEXT = """Context:
+- Domain: {domain}
+- Desired tone: {tone}
+- Name: {name}
+- Skills: {skills}
+Key points:
+{key_points}"""
+
+_PROJECT_PROMPT_PREFIX = """You are a portfolio content generator. Enhance a project description for a professional portfolio.
+
+Requirements:
+- Make it more engaging and impactful
+- Highlight the problem solved and the solution
+- Include technical achievements and impact (metrics only if given)
+- Mention technologies naturally in context
+- Use active, strong verbs (built, developed, implemented, designed)
+- Stay truthful to the original description - NO fabrication
+- NO introductory phrases like "Here is" or "The description"
+- Make it sound professional but not robotic
+
+Return ONLY the enhanced description.
+
+"""
+
+_PROJECT_PROMPT_CONTEXT = """Word count: {word_range} words
+Emphasize: {emphasis} aspects
+Project Title: {title}
+Technologies: {technologies}
+Original Description: {raw_description}"""
+
+
+# Regeneration prompts (same prefix/context split as above)
+
+_REGEN_HERO_PROMPT_PREFIX = """You are a portfolio content generator. Write an alternative hero tagline for a professional portfolio.
+
+Requirements:
+- Significantly different from the current tagline
+- Specific to the person's skills and title
+- NO clichés
+- NO introductory phrases
+
+Return ONLY the new tagline.
+
+"""
+
+_REGEN_HERO_PROMPT_CONTEXT = """Length: {min_words}-{max_words} words
+Tone: {tone}
+Style: {style}
+Avoid: {avoid}
+Context:
+- Name: {name}
+- Skills: {skills}
+- Title: {title}
+Current Tagline: {current_tagline}"""
+
+_REGEN_BIO_PROMPT_PREFIX = """You are a portfolio content generator. Rewrite the "About" bio for a professional portfolio with a different approach.
+
+Requirements:
+- Write in the first person ("I", "my")
+- Keep the facts of the current bio; do NOT invent experience, metrics, employers, or facts
+- Professional, confident, human; action-oriented language
+- NO clichés ("passionate", "innovative", etc.)
+- NO markdown and NO introductory phrases like "Here is the bio"
+
+Return ONLY the rewritten bio.
+
+"""
+
+_REGEN_BIO_PROMPT_CONTEXT = """Word count: {word_range} words
+Tone: {tone}
+Focus on: {focus}
+Context:
+- Name: {name}
+- Skills: {skills}
+Current Bio:
+{current_bio}"""
+
+_REGEN_PROJECT_PROMPT_PREFIX = """You are a portfolio content generator. Rewrite a project description for a professional portfolio with a different emphasis.
+
+Requirements:
+- Clearly different from the current description
+- Mention technologies naturally in context
+- Use active, strong verbs (built, developed, implemented, designed)
+- Stay truthful to the current description - NO fabrication
+- NO introductory phrases like "Here is" or "The description"
+
+Return ONLY the new description.
+
+"""
+
+_REGEN_PROJECT_PROMPT_CONTEXT = """Word count: {word_range} words
+Emphasize: {emphasis} aspects
+Project Title: {title}
+Technologies: {technologies}
+Current Description: {current_description}"""
+
+# Full-portfolio prompt built from a schema (GenerationAgent._build_prompt)
+
+_SCHEMA_PROMPT_PREFIX = """You are an AI portfolio content generator.
+
+You will be given:
+1. A STRUCTURED SCHEMA produced by another system
+2. A USER PROFILE with factual data
+
+Your job:
+Convert the schema into FINAL, polished portfolio content.
+
+STRICT RULES:
+- Output ONLY valid JSON
+- No markdown, no explanations, no comments
+- Do NOT change schema intent
+- Do NOT invent experience, metrics, or facts
+- Use schema as authoritative guidance
+
+TARGET OUTPUT FORMAT:
+{
+  "hero": {
+    "name": string,
+    "tagline": string (max 100 chars),
+    "bio_short": string,
+    "avatar_url": null
+  },
+  "bio_long": string (min 150 words),
+  "projects": [
+    {
+      "title": string,
+      "description": string (min 50 chars),
+      "tech_stack": [string],
+      "featured": boolean,
+      "link": null
+    }
+  ],
+  "skills": [
+    {
+      "category": string,
+      "items": [string]
+    }
+  ],
+  "theme": {
+    "primary_color": "#RRGGBB",
+    "style": "modern_tech" | "minimalist" | "creative"
+  },
+  "quality_score": number between 0 and 1
+}
+
+CONTENT GUIDELINES:
+- Professional, confident, human
+- Action-oriented language
+- No clichés ("passionate", "innovative", etc.)
+- Expand reference_points into natural prose
+- Respect layout_hints.density for verbosity
+- Highlight higher priority projects more strongly
+
+"""
+
+_SCHEMA_PROMPT_CONTEXT = """SCHEMA (instructional, DO NOT MODIFY STRUCTURE):
+{schema}
+
+USER PROFILE (facts only):
+{profile}
 
-from agents.schemas.portfolio import PortfolioOutput
+Generate the JSON now."""
 
 
-class GenerationAgent:
+@functools.lru_cache(maxsize=64)
+def _domain_context(template: str, domain: str) -> str:
+    """
+    A prompt context template with the domain already filled in.
+    Domains come from a small set, so each (template, domain) pair is
+    specialized once and the per-call format() only fills the other fields.
     """
-    Transforms SchemaBuilderAgent output into final portfolio content.
+    label = domain.replace('_', ' ').replace('{', '{{').replace('}', '}}')
+    return template.replace('{domain}', label)
 
-    Input:
-      - schema: structured semantic schema from SchemaBuilderAgent
-      - profile: original normalized profile data
 
-    Output:
-      - PortfolioOutput (validated, render-ready)
+class GenerationAgent:
     """
     Production-ready AI-powered content generator using Google Gemini.
     
@@ -112,6 +960,13 @@ class GenerationAgent:
     - Detailed logging and metrics
     """
     
+    # Max project descriptions enhanced concurrently per generate() call
+    MAX_PARALLEL_PROJECTS = 5
+    # Max portfolios generated concurrently per generate_many() call
+    MAX_PARALLEL_JOBS = 4
+    # Max sections regenerated concurrently per regenerate_sections() call
+    MAX_PARALLEL_REGENERATIONS = 6
+    
     def __init__(self, config: Optional[Union[Dict[str, Any], GenerationConfig]] = None):
         """
         Initialize content generator with Gemini configuration.
@@ -138,65 +993,31 @@ class GenerationAgent:
                 "GEMINI_API_KEY not found. Set it as environment variable or in config."
             )
         
-        # Initialize Gemini Client (new google.genai API)
-        try:
-            self.client = genai.Client(api_key=self.api_key)
-        except Exception as e:
-            raise GenerationError(f"Failed to initialize Gemini client: {str(e)}") from e
-        
-        # Safety settings (new API uses types.SafetySetting)
-        if self.config.block_none_harmful:
-            self.safety_settings = [
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE
-                ),
-            ]
-        else:
-            self.safety_settings = [
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HARASSMENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_NONE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
-                    threshold=types.HarmBlockThreshold.BLOCK_NONE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
-                    threshold=types.HarmBlockThreshold.BLOCK_NONE
-                ),
-                types.SafetySetting(
-                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                    threshold=types.HarmBlockThreshold.BLOCK_NONE
-                ),
-            ]
+        # Gemini clients are built per event loop on first use (see the client
+        # property), each on that loop's shared connection pool
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, genai.Client]]" = (
+            weakref.WeakKeyDictionary()
+        )
         
-        # Store model name and config for use in generation
+        # Request configs are memoized per setting and shared across agents
         self.model_name = self.config.model_name
-        self.generation_config = types.GenerationConfig(
-            temperature=self.config.temperature,
-            top_p=self.config.top_p,
-            top_k=self.config.top_k,
-            max_output_tokens=self.config.max_output_tokens,
+        config_key = (
+            self.config.temperature,
+            self.config.top_p,
+            self.config.top_k,
+            self.config.max_output_tokens,
+            self.config.block_none_harmful,
         )
+        self.generation_config = _build_generate_config(*config_key)
+        # Same settings, but constrained to a JSON response (combined generation)
+        self.json_generation_config = _build_generate_config(*config_key, json_output=True)
+        self.safety_settings = self.generation_config.safety_settings
         
         # Initialize components
         self.validator = ContentValidator()
-        self.rate_limiter = RateLimiter(self.config.requests_per_minute)
         self.cache = ContentCache(self.config.cache_ttl) if self.config.enable_cache else None
+        # Coalesces concurrent identical regeneration prompts (never cached)
+        self._inflight_prompts = _SingleFlight()
         
         # Metrics
         self._generation_count = 0
@@ -209,48 +1030,123 @@ class GenerationAgent:
             self.config.temperature
         )
     
-    async def _generate_content_async(self, prompt: str) -> str:
+    @property
+    def client(self) -> "genai.Client":
+        """
+        Gemini client (new google.genai API) for the running loop, on that loop's
+        pooled keep-alive HTTP client, so concurrent calls and retries reuse warm
+        TLS connections. Rebuilt if the pool was closed by close_http_clients().
+        """
+        loop = asyncio.get_running_loop()
+        http_client = _shared_http_client(self.config.generation_timeout)
+        entry = self._clients.get(loop)
+        if entry is None or entry[0] is not http_client:
+            try:
+                client = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(httpx_async_client=http_client)
+                )
+            except Exception as e:
+                raise GenerationError(f"Failed to initialize Gemini client: {str(e)}") from e
+            entry = self._clients[loop] = (http_client, client)
+        return entry[1]
+    
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Limiter shared by all agents with the same limits (RPM/TPM are per API key, not per agent)."""
+        return _shared_rate_limiter(
+            self.config.requests_per_minute,
+            self.config.tokens_per_minute,
+            self.config.max_concurrent_requests
+        )
+    
+    async def _generate_content_async(
+        self,
+        prompt: str,
+        config: Optional[types.GenerateContentConfig] = None,
+        timeout: Optional[float] = None
+    ) -> str:
         """
         Helper method to generate content using the new google.genai API.
         
         Args:
             prompt: Text prompt to send to the model
+            config: Generation config override (defaults to self.generation_config)
+            timeout: Deadline in seconds for the whole call (defaults to config.generation_timeout)
             
         Returns:
             Generated text as string
             
         Raises:
-            GenerationError: If generation fails
+            asyncio.TimeoutError: If the deadline passes (the stream is closed first)
+            GenerationError: If generation fails, or a JSON-mode response
+                doesn't open or close like JSON
         """
         try:
-            # Create content parts
-            contents = [types.Part.from_text(prompt)]
-            
-            # Generate content using the new API
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents=contents,
-                config=self.generation_config,
-                safety_settings=self.safety_settings
-            )
-            
-            # Extract text from response
-            if not response or not response.candidates:
-                raise GenerationError("No response from Gemini")
-            
-            candidate = response.candidates[0]
-            if not candidate.content or not candidate.content.parts:
-                raise GenerationError("Empty content in response")
+            config = config or self.generation_config
+            json_mode = config.response_mime_type == 'application/json'
+            # Rough budget: ~4 characters per prompt token, plus the output cap
+            est_tokens = len(prompt) // 4 + self.config.max_output_tokens
+            # Paced and slotted first, so the deadline only covers the call. In-place
+            # deadline rather than wait_for: no wrapper task per call, and the
+            # cancellation unwinds through aclosing() so the HTTP stream is closed
+            async with self.rate_limiter.slot(est_tokens), \
+                    asyncio.timeout(timeout or self.config.generation_timeout):
+                # Consume the stream as it arrives so a refusal can be caught from its
+                # opening tokens, instead of after the whole completion has been generated
+                chunks = []
+                scanned = 0
+                async with contextlib.aclosing(self._stream_content(prompt, config)) as stream:
+                    async for text in stream:
+                        chunks.append(text)
+                        if scanned < _REFUSAL_SCAN_CHARS:
+                            scanned += len(text)
+                            head = ''.join(chunks).lstrip()
+                            if _REFUSAL_RE.match(head):
+                                # Leaving the block closes the stream; callers retry
+                                raise GenerationError("Model declined the request")
+                            if json_mode and head and head[0] not in '{[':
+                                raise GenerationError("Response is not JSON")
             
-            text_part = candidate.content.parts[0]
-            if not hasattr(text_part, 'text') or not text_part.text:
+            if not chunks:
                 raise GenerationError("No text in response")
+            # A JSON body cut off (e.g. at max_output_tokens) can't parse; say so
+            # without paying for a full parse of the text
+            if json_mode and not _ends_like_json(chunks):
+                raise GenerationError("Truncated JSON response")
             
-            return text_part.text
+            return ''.join(chunks)
             
+        except (asyncio.TimeoutError, RateLimitError, RequestRejectedError):
+            raise
         except Exception as e:
             raise GenerationError(f"Content generation failed: {str(e)}") from e
     
+    async def _stream_content(
+        self,
+        prompt: str,
+        config: Optional[types.GenerateContentConfig] = None
+    ) -> AsyncIterator[str]:
+        """Yield response text chunks as Gemini produces them."""
+        try:
+            # Safety settings live in the config
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model_name,
+                contents=prompt,
+                config=config or self.generation_config
+            )
+            try:
+                async for chunk in stream:
+                    if chunk.text:
+                        yield chunk.text
+            finally:
+                # Closed early (e.g. a refusal was detected): stop the underlying HTTP stream
+                await stream.aclose()
+        except genai_errors.ClientError as e:
+            if e.code == 429:
+                raise RateLimitError(f"Rate limit exceeded: {e.message}", retry_after=_retry_after(e)) from e
+            raise RequestRejectedError(f"Request rejected ({e.code}): {e.message}") from e
+    
     async def generate(
         self,
         schema: Dict[str, Any],
@@ -272,58 +1168,61 @@ class GenerationAgent:
             GenerationError: If generation fails
             ValidationError: If generated content fails validation
         """
+        return await self._generate_portfolio(schema, user_data, preferences)
+    
+    async def generate_many(
+        self,
+        jobs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        preferences: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate portfolios for many (schema, user_data) jobs, e.g. offline regeneration.
+        
+        With config.use_batch_api, every job's combined prompt is submitted in
+        one Gemini batch job (cheaper, but completes in minutes to hours), and
+        sections the batch doesn't cover fall back to live calls. Otherwise each
+        job runs through generate(). At most MAX_PARALLEL_JOBS portfolios are
+        in flight at once; results line up with `jobs`.
+        """
+        preferences = preferences or {}
+        if self.config.use_batch_api and jobs:
+            combined = await self._generate_all_batch(jobs, preferences)
+        else:
+            combined = [None] * len(jobs)
+        
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_JOBS)
+        
+        async def run(job: Tuple[Dict[str, Any], Dict[str, Any]], prefetched: Optional[Dict[str, Any]]):
+            schema, user_data = job
+            async with semaphore:
+                return await self._generate_portfolio(schema, user_data, preferences, combined=prefetched)
+        
+        return await asyncio.gather(*(run(job, c) for job, c in zip(jobs, combined)))
+    
+    async def _generate_portfolio(
+        self,
+        schema: Dict[str, Any],
+        user_data: Dict[str, Any],
+        preferences: Optional[Dict[str, Any]] = None,
+        combined: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Body of generate(). `combined` holds sections already produced by the
+        combined request (see _generate_all_safe); None means make that request here.
+        """
         try:
             logger.info("Starting content generation with Gemini")
-            start_time = datetime.utcnow()
-            
-            preferences = preferences or {}
-            portfolio = {}
-            
-            # Generate hero section
-            portfolio['hero'] = await self._generate_hero_safe(
-                schema.get('hero', {}),
-                user_data,
-                schema.get('domain', 'software_engineering'),
-                preferences
-            )
-            logger.info("✓ Hero section generated")
-            
-            # Generate bio
-            portfolio['bio'] = await self._generate_bio_safe(
-                schema.get('bio', {}),
-                user_data,
-                schema.get('domain', 'software_engineering'),
-                preferences
-            )
-            logger.info("✓ Bio generated")
-            
-            # Generate/enhance projects
-            portfolio['projects'] = await self._generate_projects_safe(
-                schema.get('projects', []),
-                user_data,
-                preferences
-            )
-            logger.info("✓ Projects enhanced")
-            
-            # Include skills as-is (already structured)
-            portfolio['skills'] = schema.get('skills', [])
-            
-            # Include experience and education
-            portfolio['experience'] = user_data.get('experience', [])
-            portfolio['education'] = user_data.get('education', [])
+            start_ns = time.perf_counter_ns()
             
-            # Include layout hints and theme
-            portfolio['layout'] = schema.get('layout_hints', {})
-            portfolio['theme'] = schema.get('theme_suggestions', {})
+            sections = {}
+            stream = self.generate_stream(schema, user_data, preferences, combined=combined)
+            async with contextlib.aclosing(stream):
+                async for name, content in stream:
+                    sections[name] = content
+            logger.info("✓ Hero, bio and projects generated")
             
-            # Add generation metadata
-            duration = (datetime.utcnow() - start_time).total_seconds()
-            portfolio['metadata'] = {
-                'generation_duration': round(duration, 3),
-                'model': self.config.model_name,
-                'temperature': self.config.temperature,
-                'generated_sections': ['hero', 'bio', 'projects']
-            }
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
+            portfolio = self.assemble_portfolio(schema, user_data, sections, duration)
             
             logger.info(
                 "Content generation completed successfully in %.3fs",
@@ -335,127 +1234,460 @@ class GenerationAgent:
             logger.error("Error in content generation: %s", str(e), exc_info=True)
             raise GenerationError(f"Content generation failed: {str(e)}") from e
     
+    async def generate_stream(
+        self,
+        schema: Dict[str, Any],
+        user_data: Dict[str, Any],
+        preferences: Optional[Dict[str, Any]] = None,
+        combined: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Yield ('hero' | 'bio' | 'projects', content) as each section is ready.
+        
+        Sections run concurrently and arrive in completion order, so a caller
+        can check one while the others are still generating. Closing the
+        stream early (or a section raising) cancels whatever is still running.
+        Errors propagate unwrapped; generate() wraps them in GenerationError.
+        """
+        preferences = preferences or {}
+        
+        domain = schema.get('domain', 'software_engineering')
+        # Prompt inputs shared by every section, extracted once
+        ctx = _GenerationContext.from_inputs(user_data, domain)
+        
+        # One combined request covers every section when its JSON parses and
+        # validates; anything it misses falls back to per-section calls below
+        if combined is None:
+            combined = await self._generate_all_safe(schema, ctx, preferences)
+        
+        # The remaining calls are independent round-trips to Gemini, so run them
+        # concurrently: latency is the slowest call, not the sum
+        tasks = {}
+        if 'hero' not in combined:
+            tasks[asyncio.create_task(self._generate_hero_safe(
+                schema.get('hero', {}),
+                ctx,
+                preferences
+            ))] = 'hero'
+        if 'bio' not in combined:
+            tasks[asyncio.create_task(self._generate_bio_safe(
+                schema.get('bio', {}),
+                ctx,
+                preferences
+            ))] = 'bio'
+        tasks[asyncio.create_task(self._generate_projects_safe(
+            schema.get('projects', []),
+            user_data,
+            preferences,
+            enhanced=combined.get('projects')
+        ))] = 'projects'
+        
+        try:
+            for name in ('hero', 'bio'):
+                if name in combined:
+                    yield name, combined[name]
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield tasks[task], task.result()
+        finally:
+            # Don't leave sibling calls running after the consumer stops or one fails
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark retrieved; the first failure already propagated
+    
+    def assemble_portfolio(
+        self,
+        schema: Dict[str, Any],
+        user_data: Dict[str, Any],
+        sections: Dict[str, Any],
+        duration: float
+    ) -> Dict[str, Any]:
+        """
+        Build the portfolio dict from the generated sections (as collected from
+        generate_stream) plus the structured parts that need no generation.
+        """
+        portfolio = {
+            'hero': sections['hero'],
+            'bio': sections['bio'],
+            'projects': sections['projects'],
+        }
+        
+        # Include skills as-is (already structured)
+        portfolio['skills'] = schema.get('skills', [])
+        
+        # Include experience and education
+        portfolio['experience'] = user_data.get('experience', [])
+        portfolio['education'] = user_data.get('education', [])
+        
+        # Include layout hints and theme
+        portfolio['layout'] = schema.get('layout_hints', {})
+        portfolio['theme'] = schema.get('theme_suggestions', {})
+        
+        # Add generation metadata
+        portfolio['metadata'] = {
+            'generation_duration': round(duration, 3),
+            'model': self.config.model_name,
+            'temperature': self.config.temperature,
+            'generated_sections': ['hero', 'bio', 'projects']
+        }
+        return portfolio
+    
+    async def _generate_all_safe(
+        self,
+        schema: Dict[str, Any],
+        ctx: _GenerationContext,
+        preferences: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Generate every section in one request and keep the parts that validate.
+        
+        Returns a dict with any of 'hero', 'bio' and 'projects' (ID -> description).
+        Missing keys mean the caller should fall back to per-section generation;
+        rate limits are retried (honouring retry_after), and failures that
+        remain are logged, never raised.
+        
+        The cache is shared with the per-section paths, under the same keys:
+        cached sections are used as-is (no request at all when they cover
+        everything), and the sections this request produces are cached.
+        """
+        keys = self._combined_cache_keys(schema, ctx, preferences) if self.cache else None
+        cached = await self._get_cached_sections(keys) if keys else {}
+        if keys and 'hero' in cached and 'bio' in cached and len(cached.get('projects', {})) == len(keys['projects']):
+            logger.info("Combined sections retrieved from cache")
+            return cached
+        
+        try:
+            raw = await self._generate_all(schema, ctx, preferences)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Combined generation failed, using per-section calls: %s", str(e))
+            return cached
+        
+        sections = self._select_combined_sections(raw, schema)
+        if keys:
+            await self._cache_sections(keys, sections)
+        
+        # Cached sections win, as they would on the per-section paths
+        projects = {**sections.get('projects', {}), **cached.get('projects', {})}
+        sections.update(cached)
+        if projects:
+            sections['projects'] = projects
+        return sections
+    
+    def _combined_cache_keys(
+        self,
+        schema: Dict[str, Any],
+        ctx: _GenerationContext,
+        preferences: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """The per-section cache keys of everything the combined request covers."""
+        projects = {
+            p['id']: self._project_cache_key(
+                p.get('title', f'Project {idx + 1}'),
+                p.get('raw_description', ''),
+                p.get('tech_stack', []),
+                p.get('target_length', 'medium'),
+                preferences
+            )
+            for idx, p in enumerate(schema.get('projects', []))
+            if p.get('needs_enhancement') and p.get('id')
+        }
+        return {
+            'hero': self._hero_cache_key(schema.get('hero', {}), ctx),
+            'bio': self._bio_cache_key(schema.get('bio', {}), ctx),
+            'projects': projects,
+        }
+    
+    async def _get_cached_sections(self, keys: Dict[str, Any]) -> Dict[str, Any]:
+        """Cached sections for `keys`, shaped like _select_combined_sections() output."""
+        sections = {}
+        for name in ('hero', 'bio'):
+            value = await self.cache.get(keys[name])
+            if value is not None:
+                sections[name] = value
+        
+        projects = {}
+        for project_id, key in keys['projects'].items():
+            value = await self.cache.get(key)
+            if value is not None:
+                projects[project_id] = value
+        
+        self._cache_hits += len(sections) + len(projects)
+        if projects:
+            sections['projects'] = projects
+        return sections
+    
+    async def _cache_sections(self, keys: Dict[str, Any], sections: Dict[str, Any]) -> None:
+        """Store combined-request sections under their per-section cache keys."""
+        for name in ('hero', 'bio'):
+            if name in sections:
+                await self.cache.set(keys[name], sections[name])
+        for project_id, description in sections.get('projects', {}).items():
+            await self.cache.set(keys['projects'][project_id], description)
+    
+    def _select_combined_sections(self, raw: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Clean and validate a combined response, keeping only the sections that pass."""
+        result = {}
+        
+        tagline = raw.get('tagline')
+        if isinstance(tagline, str):
+            tagline = self._accept_tagline(self._clean_tagline(tagline.strip()))
+            if tagline is not None:
+                result['hero'] = self._build_hero(schema.get('hero', {}), tagline)
+        
+        bio = raw.get('bio')
+        if isinstance(bio, str):
+            bio = self._clean_bio(bio)
+            if self.validator.validate_bio(bio, self.config):
+                result['bio'] = bio
+        
+        requested = {
+            p.get('id') for p in schema.get('projects', [])
+            if p.get('needs_enhancement') and p.get('id')
+        }
+        projects = {}
+        for item in raw.get('projects') or []:
+            if not isinstance(item, dict) or item.get('id') not in requested:
+                continue
+            description = item.get('description')
+            if isinstance(description, str):
+                description = self._clean_description(description)
+                if self.validator.validate_project_description(description, self.config):
+                    projects[item['id']] = description
+        if projects:
+            result['projects'] = projects
+        
+        if result:
+            self._generation_count += 1
+        logger.info("Combined generation produced sections: %s", sorted(result))
+        return result
+    
+    @_retry_rate_limited
+    async def _generate_all(
+        self,
+        schema: Dict[str, Any],
+        ctx: _GenerationContext,
+        preferences: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Single Gemini request for tagline, bio and project descriptions (parsed JSON)."""
+        
+        response = await self._generate_content_async(
+            self._build_combined_prompt(schema, ctx, preferences),
+            self.json_generation_config
+        )
+        return self._parse_combined(response)
+    
+    async def _generate_all_batch(
+        self,
+        jobs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        preferences: Dict[str, Any]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Submit every job's combined prompt as one Gemini batch job and wait for it.
+        
+        Returns one entry per job: the validated sections (as from
+        _generate_all_safe), or None where the batch gave no usable response,
+        so that job makes its own combined request instead.
+        """
+        requests = [
+            types.InlinedRequest(
+                contents=self._build_combined_prompt(
+                    schema,
+                    _GenerationContext.from_inputs(
+                        user_data, schema.get('domain', 'software_engineering')
+                    ),
+                    preferences
+                ),
+                config=self.json_generation_config
+            )
+            for schema, user_data in jobs
+        ]
+        
+        try:
+            await self.rate_limiter.acquire()
+            batch = await self.client.aio.batches.create(
+                model=self.model_name,
+                src=requests,
+                config=types.CreateBatchJobConfig(display_name='portfolio-generation')
+            )
+            logger.info("Submitted batch %s with %d portfolios", batch.name, len(requests))
+            while batch.state not in _BATCH_DONE_STATES:
+                await asyncio.sleep(self.config.batch_poll_interval)
+                batch = await self.client.aio.batches.get(name=batch.name)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Batch generation failed, using live calls: %s", str(e))
+            return [None] * len(jobs)
+        
+        if batch.state != types.JobState.JOB_STATE_SUCCEEDED:
+            logger.warning("Batch %s finished as %s", batch.name, batch.state)
+        
+        # Inlined responses come back in request order
+        responses = (batch.dest.inlined_responses if batch.dest else None) or []
+        results = [None] * len(jobs)
+        for idx, ((schema, _), item) in enumerate(zip(jobs, responses)):
+            try:
+                if item.error or not item.response or not item.response.text:
+                    raise GenerationError(f"No response: {item.error}")
+                results[idx] = self._select_combined_sections(
+                    self._parse_combined(item.response.text), schema
+                )
+            except Exception as e:
+                logger.warning("Batch response %d unusable, using live calls: %s", idx, str(e))
+        return results
+    
+    def _build_combined_prompt(
+        self,
+        schema: Dict[str, Any],
+        ctx: _GenerationContext,
+        preferences: Dict[str, Any]
+    ) -> str:
+        """Prompt asking for every section at once, as one JSON object."""
+        skills = ctx.skills
+        length_map = {
+            'short': '80-100',
+            'medium': '100-130',
+            'long': '130-160'
+        }
+        projects = [
+            {
+                'id': p['id'],
+                'title': p.get('title', ''),
+                'technologies': sorted(p.get('tech_stack', [])),
+                'word_count': length_map.get(p.get('target_length'), '100-130'),
+                'original_description': p.get('raw_description', '')
+            }
+            for p in schema.get('projects', [])
+            if p.get('needs_enhancement') and p.get('id')
+        ]
+        
+        # Static instructions first, per-user context last (keeps the prefix cacheable)
+        prompt = _COMBINED_PROMPT_PREFIX + _domain_context(_COMBINED_PROMPT_CONTEXT, ctx.domain).format(
+            tone=preferences.get('tone', ToneStyle.PROFESSIONAL.value),
+            emphasis=preferences.get('emphasis', EmphasisType.TECHNICAL.value),
+            name=ctx.name,
+            skills=', '.join(skills) if skills else 'Not specified',
+            key_points='\n'.join(
+                f'- {point}' for point in schema.get('bio', {}).get('key_points', [])
+            ) or '- Not specified',
+            projects=_compact_json(projects)
+        )
+        return prompt
+    
+    @staticmethod
+    def _parse_combined(response: str) -> Dict[str, Any]:
+        """Parse a combined response, which must be a JSON object."""
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+        data = orjson.loads(response) if orjson else json.loads(response)
+        if not isinstance(data, dict):
+            raise GenerationError("Combined response is not a JSON object")
+        return data
+    
     async def _generate_hero_safe(
         self,
         hero_schema: Dict[str, Any],
-        user_data: Dict[str, Any],
-        domain: str,
+        ctx: _GenerationContext,
         preferences: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate hero section with validation and retries."""
         
-        # Check cache
-        cache_key = None
-        if self.cache:
-            cache_key = self.cache._generate_key(
-                'hero',
-                hero_schema.get('name'),
-                domain,
-                tuple(user_data.get('skills', [])[:5])
-            )
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.info("Hero section retrieved from cache")
-                self._cache_hits += 1
-                return cached
-        
-        # Generate with retries
-        for attempt in range(self.config.max_retries):
+        async def generate() -> Dict[str, Any]:
+            # Retries, including on failed validation, happen in _generate_hero
             try:
                 hero = await self._generate_hero(
                     hero_schema,
-                    user_data,
-                    domain,
+                    ctx,
                     preferences
                 )
-                
-                # Validate
-                if not self.validator.validate_hero_tagline(
-                    hero['tagline'],
-                    self.config
-                ):
-                    if attempt < self.config.max_retries - 1:
-                        logger.warning(
-                            "Hero tagline validation failed, retrying (attempt %d/%d)",
-                            attempt + 1,
-                            self.config.max_retries
-                        )
-                        await asyncio.sleep(1)
-                        continue
-                    else:
-                        self._validation_failures += 1
-                        raise ContentValidationError(
-                            f"Hero tagline validation failed after {self.config.max_retries} attempts"
-                        )
-                
-                # Cache if valid
-                if self.cache and cache_key:
-                    await self.cache.set(cache_key, hero)
-                
-                self._generation_count += 1
-                return hero
-                
-            except (RateLimitError, asyncio.TimeoutError):
-                raise
-            except Exception as e:
-                if attempt < self.config.max_retries - 1:
-                    logger.warning(
-                        "Hero generation failed, retrying: %s",
-                        str(e)
-                    )
-                    await asyncio.sleep(2 ** attempt)
-                    continue
+            except ContentValidationError:
+                self._validation_failures += 1
                 raise
+            self._generation_count += 1
+            return hero
         
-        raise GenerationError("Hero generation failed after all retries")
+        if not self.cache:
+            return await generate()
+        
+        cache_key = self._hero_cache_key(hero_schema, ctx)
+        return await self._get_or_generate(cache_key, generate, 'Hero section')
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @staticmethod
+    def _hero_cache_key(hero_schema: Dict[str, Any], ctx: _GenerationContext) -> str:
+        return ContentCache._generate_key('hero', hero_schema.get('name'), ctx.domain, ctx.top_skills)
+    
+    @staticmethod
+    def _bio_cache_key(bio_schema: Dict[str, Any], ctx: _GenerationContext) -> str:
+        return ContentCache._generate_key('bio', tuple(bio_schema.get('key_points', [])[:5]), ctx.domain)
+    
+    @staticmethod
+    def _project_cache_key(
+        title: str,
+        raw_description: str,
+        tech_stack: List[str],
+        target_length: str,
+        preferences: Dict[str, Any]
+    ) -> str:
+        # Normalized so copies differing only in case, spacing or stack order
+        # share an entry; length/emphasis are included since they shape the output
+        return ContentCache._generate_key(
+            'project',
+            _normalize_text(title),
+            _normalize_text(raw_description),
+            sorted({_normalize_text(t) for t in tech_stack}),
+            target_length,
+            preferences.get('emphasis')
+        )
+    
+    async def _get_or_generate(
+        self,
+        cache_key: str,
+        generate: Callable[[], Awaitable[Any]],
+        label: str
+    ) -> Any:
+        """Serve `cache_key` from the cache, joining an identical in-flight generation if any."""
+        generated = False
+        
+        async def tracked() -> Any:
+            nonlocal generated
+            generated = True
+            return await generate()
+        
+        value = await self.cache.get_or_create(cache_key, tracked)
+        if not generated:
+            logger.info("%s retrieved from cache", label)
+            self._cache_hits += 1
+        return value
+    
+    @_retry_generation
     async def _generate_hero(
         self,
         hero_schema: Dict[str, Any],
-        user_data: Dict[str, Any],
-        domain: str,
+        ctx: _GenerationContext,
         preferences: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Generate hero section with compelling tagline."""
         
-        # Rate limiting
-        await self.rate_limiter.acquire()
-        
-        skills = user_data.get('skills', [])[:5]
-        projects = user_data.get('projects', [])
+        skills = ctx.top_skills
         tone = preferences.get('tone', ToneStyle.PROFESSIONAL.value)
         
-        prompt = f"""Generate a compelling hero tagline for a {domain.replace('_', ' ')}'s portfolio.
-
-Context:
-- Name: {hero_schema.get('name', 'Professional')}
-- Top Skills: {', '.join(skills) if skills else 'Various technical skills'}
-- Number of projects: {len(projects)}
-- Desired tone: {tone}
-
-    def __init__(self, model: str = "gemini-1.5-pro"):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise RuntimeError("GEMINI_API_KEY not set")
-
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model)
-
-Return ONLY the tagline text, nothing else."""
+        # Static instructions first, per-user context last (keeps the prefix cacheable)
+        prompt = _HERO_PROMPT_PREFIX + _domain_context(_HERO_PROMPT_CONTEXT, ctx.domain).format(
+            tone=tone,
+            project_count=ctx.project_count,
+            name=hero_schema.get('name', 'Professional'),
+            skills=', '.join(skills) if skills else 'Various technical skills'
+        )
         
         try:
             # Generate with timeout
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
@@ -465,38 +1697,39 @@ Return ONLY the tagline text, nothing else."""
             # Clean up common issues
             tagline = self._clean_tagline(tagline)
             
-            return {
-                'name': hero_schema.get('name', 'Portfolio'),
-                'tagline': tagline,
-                'title': hero_schema.get('title', ''),
-                'email': hero_schema.get('email'),
-                'phone': hero_schema.get('phone'),
-                'location': hero_schema.get('location'),
-                'links': hero_schema.get('links', {})
-            }
-            
         except asyncio.TimeoutError:
             logger.error("Hero generation timed out")
             raise
+        except (RequestRejectedError, RateLimitError, asyncio.CancelledError):
+            # Left unwrapped so the retry policy can skip rejects and honour retry_after
+            raise
         except Exception as e:
             logger.error("Hero generation error: %s", str(e))
             raise GenerationError(f"Failed to generate hero: {str(e)}") from e
+        
+        # Validate (raising here lets the retry policy try again)
+        accepted = self._accept_tagline(tagline)
+        if accepted is None:
+            raise ContentValidationError("Hero tagline failed validation", content=tagline)
+        
+        return self._build_hero(hero_schema, accepted)
+    
+    def _build_hero(self, hero_schema: Dict[str, Any], tagline: str) -> Dict[str, Any]:
+        """Assemble the hero section around a generated tagline."""
+        return {
+            'name': hero_schema.get('name', 'Portfolio'),
+            'tagline': tagline,
+            'title': hero_schema.get('title', ''),
+            'email': hero_schema.get('email'),
+            'phone': hero_schema.get('phone'),
+            'location': hero_schema.get('location'),
+            'links': hero_schema.get('links', {})
+        }
     
     def _clean_tagline(self, tagline: str) -> str:
         """Clean and normalize tagline."""
         # Remove common prefixes
-        prefixes_to_remove = [
-            'here is the tagline:',
-            'here is:',
-            'tagline:',
-            'the tagline is:',
-        ]
-        
-        tagline_lower = tagline.lower()
-        for prefix in prefixes_to_remove:
-            if tagline_lower.startswith(prefix):
-                tagline = tagline[len(prefix):].strip()
-                break
+        tagline = _strip_preamble(tagline, _TAGLINE_PREAMBLE_RE)
         
         # Remove quotes
         tagline = tagline.strip('"\'')
@@ -507,103 +1740,84 @@ Return ONLY the tagline text, nothing else."""
         
         return tagline
     
+    def _accept_tagline(self, tagline: str) -> Optional[str]:
+        """
+        The tagline if it validates, else a locally repaired copy if that does,
+        else None. Most rejects are just too long (or several options on
+        separate lines), which trimming fixes without another model call.
+        """
+        if self.validator.validate_hero_tagline(tagline, self.config):
+            return tagline
+        
+        # First line only, cut to the word limit without a dangling connective
+        lines = tagline.strip().splitlines()
+        words = (lines[0] if lines else '').split()[:self.config.hero_max_words]
+        while words and words[-1].rstrip(',;:').lower() in _TAGLINE_DANGLING_WORDS:
+            words.pop()
+        fitted = ' '.join(words).rstrip(',;:-')
+        
+        if fitted and fitted != tagline and self.validator.validate_hero_tagline(fitted, self.config):
+            logger.info("Trimmed tagline to pass validation instead of regenerating")
+            return fitted
+        return None
+    
     async def _generate_bio_safe(
         self,
         bio_schema: Dict[str, Any],
-        user_data: Dict[str, Any],
-        domain: str,
+        ctx: _GenerationContext,
         preferences: Dict[str, Any]
     ) -> str:
         """Generate bio with validation and retries."""
         
-        # Check cache
-        cache_key = None
-        if self.cache:
-            cache_key = self.cache._generate_key(
-                'bio',
-                tuple(bio_schema.get('key_points', [])[:5]),
-                domain
-            )
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.info("Bio retrieved from cache")
-                self._cache_hits += 1
-                return cached
-        
-        # Generate with retries
-        for attempt in range(self.config.max_retries):
+        async def generate() -> str:
+            # Retries, including on failed validation, happen in _generate_bio
             try:
                 bio = await self._generate_bio(
                     bio_schema,
-                    user_data,
-                    domain,
+                    ctx,
                     preferences
                 )
-                
-                # Validate
-                if not self.validator.validate_bio(bio, self.config):
-                    if attempt < self.config.max_retries - 1:
-                        logger.warning(
-                            "Bio validation failed, retrying (attempt %d/%d)",
-                            attempt + 1,
-                            self.config.max_retries
-                        )
-                        await asyncio.sleep(1)
-                        continue
-                    else:
-                        self._validation_failures += 1
-                        logger.warning(
-                            "Bio validation failed after retries, using anyway"
-                        )
-                
-                # Cache if valid
-                if self.cache and cache_key:
-                    await self.cache.set(cache_key, bio)
-                
+            except ContentValidationError:
+                self._validation_failures += 1
                 self._generation_count += 1
-                return bio
-                
-            except (RateLimitError, asyncio.TimeoutError):
-                raise
-            except Exception as e:
-                if attempt < self.config.max_retries - 1:
-                    logger.warning("Bio generation failed, retrying: %s", str(e))
-                    await asyncio.sleep(2 ** attempt)
-                    continue
                 raise
+            self._generation_count += 1
+            return bio
         
-        raise GenerationError("Bio generation failed after all retries")
+        try:
+            if not self.cache:
+                return await generate()
+            cache_key = self._bio_cache_key(bio_schema, ctx)
+            return await self._get_or_generate(cache_key, generate, 'Bio')
+        except ContentValidationError as e:
+            logger.warning("Bio validation failed after retries, using anyway")
+            # Not cached: a later request should get another chance at a valid bio
+            return e.content
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @_retry_generation
     async def _generate_bio(
         self,
-        schema: Dict[str, Any],
-        profile: Dict[str, Any],
-    ) -> PortfolioOutput:
-        prompt = self._build_prompt(schema, profile)
-
-        response = await asyncio.to_thread(
-            self.model.generate_content,
-            prompt
+        bio_schema: Dict[str, Any],
+        ctx: _GenerationContext,
+        preferences: Dict[str, Any]
+    ) -> str:
+        """Generate the long-form professional bio."""
+        
+        key_points = bio_schema.get('key_points', [])
+        skills = ctx.skills
+        tone = preferences.get('tone', ToneStyle.PROFESSIONAL.value)
+        
+        # Static instructions first, per-user context last (keeps the prefix cacheable)
+        prompt = _BIO_PROMPT_PREFIX + _domain_context(_BIO_PROMPT_CONTEXT, ctx.domain).format(
+            tone=tone,
+            name=ctx.name,
+            skills=', '.join(skills) if skills else 'Not specified',
+            key_points='\n'.join(f'- {point}' for point in key_points) or '- Not specified'
         )
-
-        if not response or not response.text:
-            raise RuntimeError("Gemini returned empty response")
-
-        raw = self._extract_json(response.text)
-
+        
         try:
             # Generate with timeout
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
@@ -613,52 +1827,72 @@ Return ONLY the tagline text, nothing else."""
             # Clean up
             bio = self._clean_bio(bio)
             
-            return bio
-            
         except asyncio.TimeoutError:
             logger.error("Bio generation timed out")
             raise
+        except (RequestRejectedError, RateLimitError, asyncio.CancelledError):
+            # Left unwrapped so the retry policy can skip rejects and honour retry_after
+            raise
         except Exception as e:
             logger.error("Bio generation error: %s", str(e))
             raise GenerationError(f"Failed to generate bio: {str(e)}") from e
+        
+        # Validate (raising here lets the retry policy try again)
+        if not self.validator.validate_bio(bio, self.config):
+            raise ContentValidationError("Bio failed validation", content=bio)
+        
+        return bio
     
     def _clean_bio(self, bio: str) -> str:
         """Clean and normalize bio."""
         # Remove common prefixes
-        prefixes_to_remove = [
-            'here is the bio:',
-            'here is:',
-            'bio:',
-            'the bio is:',
-            'here\'s the bio:',
-        ]
-        
-        bio_lower = bio.lower()
-        for prefix in prefixes_to_remove:
-            if bio_lower.startswith(prefix):
-                bio = bio[len(prefix):].strip()
-                break
+        bio = _strip_preamble(bio, _BIO_PREAMBLE_RE)
         
-        # Remove markdown formatting if present
-        bio = bio.replace('**', '').replace('*', '')
-        
-        # Ensure proper spacing
-        bio = ' '.join(bio.split())
-        
-        return bio
+        # Remove markdown emphasis and collapse whitespace in one pass each
+        return _collapse_prose(bio)
     
     async def _generate_projects_safe(
         self,
         projects_schema: List[Dict[str, Any]],
         user_data: Dict[str, Any],
-        preferences: Dict[str, Any]
+        preferences: Dict[str, Any],
+        enhanced: Optional[Dict[str, str]] = None
     ) -> List[Dict[str, Any]]:
-        """Generate/enhance projects with error handling."""
-        enhanced_projects = []
+        """
+        Generate/enhance projects concurrently, with per-project error handling.
+        `enhanced` maps project IDs to descriptions already produced (and
+        validated) by the combined request; those projects skip their own call.
+        """
+        enhanced = enhanced or {}
+        # Bound in-flight enhancement calls so large portfolios stay within API limits
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_PROJECTS)
         
-        for idx, project in enumerate(projects_schema):
-            try:
-                if project.get('needs_enhancement'):
+        # gather() preserves input order, so results line up with projects_schema
+        return await asyncio.gather(*(
+            self._generate_project_safe(
+                idx, project, preferences, semaphore,
+                enhanced.get(project.get('id', f'project_{idx}'))
+            )
+            for idx, project in enumerate(projects_schema)
+        ))
+    
+    async def _generate_project_safe(
+        self,
+        idx: int,
+        project: Dict[str, Any],
+        preferences: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        enhanced_desc: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Enhance a single project, falling back to its original description on error.
+        A description already produced by the combined request is used as-is.
+        """
+        try:
+            if enhanced_desc is not None:
+                logger.debug("Project '%s' enhanced by combined request", project.get('title'))
+            elif project.get('needs_enhancement'):
+                async with semaphore:
                     enhanced_desc = await self._enhance_project_description_safe(
                         project.get('title', f'Project {idx + 1}'),
                         project.get('raw_description', ''),
@@ -666,39 +1900,28 @@ Return ONLY the tagline text, nothing else."""
                         project.get('target_length', 'medium'),
                         preferences
                     )
-                else:
-                    enhanced_desc = project.get('raw_description', '')
-                
-                enhanced_projects.append({
-                    'id': project.get('id', f'project_{idx}'),
-                    'title': project.get('title', f'Project {idx + 1}'),
-                    'description': enhanced_desc,
-                    'technologies': project.get('tech_stack', []),
-                    'links': project.get('links', {}),
-                    'featured': project.get('featured', False),
-                    'duration': project.get('duration'),
-                    'role': project.get('role')
-                })
-                
-            except Exception as e:
-                logger.error(
-                    "Failed to enhance project '%s': %s",
-                    project.get('title', f'Project {idx}'),
-                    str(e)
-                )
-                # Use original description on error
-                enhanced_projects.append({
-                    'id': project.get('id', f'project_{idx}'),
-                    'title': project.get('title', f'Project {idx + 1}'),
-                    'description': project.get('raw_description', ''),
-                    'technologies': project.get('tech_stack', []),
-                    'links': project.get('links', {}),
-                    'featured': project.get('featured', False),
-                    'duration': project.get('duration'),
-                    'role': project.get('role')
-                })
-        
-        return enhanced_projects
+            else:
+                enhanced_desc = project.get('raw_description', '')
+            
+        except Exception as e:
+            logger.error(
+                "Failed to enhance project '%s': %s",
+                project.get('title', f'Project {idx}'),
+                str(e)
+            )
+            # Use original description on error
+            enhanced_desc = project.get('raw_description', '')
+        
+        return {
+            'id': project.get('id', f'project_{idx}'),
+            'title': project.get('title', f'Project {idx + 1}'),
+            'description': enhanced_desc,
+            'technologies': project.get('tech_stack', []),
+            'links': project.get('links', {}),
+            'featured': project.get('featured', False),
+            'duration': project.get('duration'),
+            'role': project.get('role')
+        }
     
     async def _enhance_project_description_safe(
         self,
@@ -710,85 +1933,40 @@ Return ONLY the tagline text, nothing else."""
     ) -> str:
         """Enhance project description with validation and retries."""
         
-        # Check cache
-        cache_key = None
-        if self.cache:
-            cache_key = self.cache._generate_key(
-                'project',
+        async def generate() -> str:
+            # Retries, including on failed validation, happen in _enhance_project_description
+            enhanced = await self._enhance_project_description(
                 title,
-                raw_description[:100],
-                tuple(tech_stack[:5])
+                raw_description,
+                tech_stack,
+                target_length,
+                preferences
             )
-            cached = await self.cache.get(cache_key)
-            if cached:
-                logger.info("Project description retrieved from cache")
-                self._cache_hits += 1
-                return cached
-        
-        # Generate with retries
-        for attempt in range(self.config.max_retries):
-            try:
-                enhanced = await self._enhance_project_description(
-                    title,
-                    raw_description,
-                    tech_stack,
-                    target_length,
-                    preferences
-                )
-                
-                # Validate
-                if not self.validator.validate_project_description(
-                    enhanced,
-                    self.config
-                ):
-                    if attempt < self.config.max_retries - 1:
-                        logger.warning(
-                            "Project description validation failed for '%s', retrying",
-                            title
-                        )
-                        await asyncio.sleep(1)
-                        continue
-                    else:
-                        logger.warning(
-                            "Project description validation failed for '%s', using original",
-                            title
-                        )
-                        return raw_description
-                
-                # Cache if valid
-                if self.cache and cache_key:
-                    await self.cache.set(cache_key, enhanced)
-                
-                self._generation_count += 1
-                return enhanced
-                
-            except (RateLimitError, asyncio.TimeoutError):
-                raise
-            except Exception as e:
-                if attempt < self.config.max_retries - 1:
-                    logger.warning(
-                        "Project enhancement failed for '%s', retrying: %s",
-                        title,
-                        str(e)
-                    )
-                    await asyncio.sleep(2 ** attempt)
-                    continue
-                logger.error(
-                    "Project enhancement failed for '%s', using original: %s",
-                    title,
-                    str(e)
-                )
-                return raw_description
+            self._generation_count += 1
+            return enhanced
         
-        return raw_description
+        try:
+            if not self.cache:
+                return await generate()
+            cache_key = self._project_cache_key(title, raw_description, tech_stack, target_length, preferences)
+            return await self._get_or_generate(cache_key, generate, 'Project description')
+        except ContentValidationError:
+            logger.warning(
+                "Project description validation failed for '%s', using original",
+                title
+            )
+            return raw_description
+        except (RateLimitError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            logger.error(
+                "Project enhancement failed for '%s', using original: %s",
+                title,
+                str(e)
+            )
+            return raw_description
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @_retry_generation
     async def _enhance_project_description(
         self,
         title: str,
@@ -799,9 +1977,6 @@ Return ONLY the tagline text, nothing else."""
     ) -> str:
         """Enhance a single project description."""
         
-        # Rate limiting
-        await self.rate_limiter.acquire()
-        
         emphasis = preferences.get('emphasis', EmphasisType.TECHNICAL.value)
         
         # Map target length to word counts
@@ -812,30 +1987,19 @@ Return ONLY the tagline text, nothing else."""
         }
         word_range = length_map.get(target_length, '100-130')
         
-        prompt = f"""Enhance this project description for a professional portfolio.
-
-Project Title: {title}
-Original Description: {raw_description}
-Technologies: {', '.join(tech_stack) if tech_stack else 'Not specified'}
-
-Requirements:
-- Word count: {word_range} words
-- Make it more engaging and impactful
-- Emphasize {emphasis} aspects
-- Highlight the problem solved and the solution
-- Include technical achievements and impact (metrics if possible)
-- Mention technologies naturally in context
-- Use active, strong verbs (built, developed, implemented, designed)
-- Stay truthful to the original description - NO fabrication
-- NO introductory phrases like "Here is" or "The description"
-- Make it sound professional but not robotic
-
+        # Static instructions first, per-project context last (keeps the prefix cacheable);
+        # technologies are sorted so equal stacks always render identically
+        prompt = _PROJECT_PROMPT_PREFIX + _PROJECT_PROMPT_CONTEXT.format(
+            word_range=word_range,
+            emphasis=emphasis,
+            title=title,
+            technologies=', '.join(sorted(tech_stack)) if tech_stack else 'Not specified',
+            raw_description=raw_description
+        )
+        
         try:
             # Generate with timeout
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
@@ -845,38 +2009,29 @@ Requirements:
             # Clean up
             enhanced = self._clean_description(enhanced)
             
-            return enhanced
-            
         except asyncio.TimeoutError:
             logger.error("Project description enhancement timed out for '%s'", title)
             raise
+        except (RequestRejectedError, RateLimitError, asyncio.CancelledError):
+            # Left unwrapped so the retry policy can skip rejects and honour retry_after
+            raise
         except Exception as e:
             logger.error("Project description enhancement error for '%s': %s", title, str(e))
             raise GenerationError(f"Failed to enhance project description: {str(e)}") from e
+        
+        # Validate (raising here lets the retry policy try again)
+        if not self.validator.validate_project_description(enhanced, self.config):
+            raise ContentValidationError("Project description failed validation", content=enhanced)
+        
+        return enhanced
     
     def _clean_description(self, description: str) -> str:
         """Clean and normalize project description."""
         # Remove common prefixes
-        prefixes_to_remove = [
-            'here is the enhanced description:',
-            'here is:',
-            'enhanced description:',
-            'the description is:',
-        ]
-        
-        desc_lower = description.lower()
-        for prefix in prefixes_to_remove:
-            if desc_lower.startswith(prefix):
-                description = description[len(prefix):].strip()
-                break
+        description = _strip_preamble(description, _DESCRIPTION_PREAMBLE_RE)
         
-        # Remove markdown
-        description = description.replace('**', '').replace('*', '')
-        
-        # Ensure proper spacing
-        description = ' '.join(description.split())
-        
-        return description
+        # Remove markdown emphasis and collapse whitespace in one pass each
+        return _collapse_prose(description)
     
     async def regenerate_section(
         self,
@@ -903,13 +2058,14 @@ Requirements:
             preferences = preferences or {}
             
             logger.info("Regenerating section: %s", section)
+            ctx = _RegenerationContext.from_context(context)
             
             if section == 'hero' or section == 'hero.tagline':
-                return await self._regenerate_hero(context, preferences)
+                return await self._regenerate_hero(ctx, preferences)
             elif section == 'bio':
-                return await self._regenerate_bio(context, preferences)
+                return await self._regenerate_bio(ctx, preferences)
             elif 'project' in section:
-                return await self._regenerate_project(context, preferences)
+                return await self._regenerate_project(ctx, preferences)
             else:
                 raise ValueError(f"Unknown section for regeneration: {section}")
                 
@@ -917,60 +2073,77 @@ Requirements:
             logger.error("Failed to regenerate section '%s': %s", section, str(e))
             raise GenerationError(f"Section regeneration failed: {str(e)}") from e
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    async def regenerate_sections(
+        self,
+        sections: List[Tuple[str, Dict[str, Any]]],
+        preferences: Optional[Dict[str, Any]] = None
+    ) -> List[Any]:
+        """
+        Regenerate several sections concurrently.
+        
+        Args:
+            sections: (section name, context) pairs, as for regenerate_section()
+            preferences: User preferences applied to every section
+            
+        Returns:
+            One entry per section, in order: the regenerated content, or the
+            GenerationError that section failed with (one failure
+            doesn't discard the others)
+        """
+        semaphore = asyncio.Semaphore(self.MAX_PARALLEL_REGENERATIONS)
+        
+        async def regenerate_one(section: str, context: Dict[str, Any]) -> Any:
+            async with semaphore:
+                return await self.regenerate_section(section, context, preferences)
+        
+        return await asyncio.gather(
+            *(regenerate_one(section, context) for section, context in sections),
+            return_exceptions=True
+        )
+    
+    async def _generate_once_for_prompt(
+        self,
+        prompt: str,
+        generate: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Result of `generate`, shared by concurrent requests for this exact
+        prompt (e.g. a double-clicked regenerate). Nothing is cached, so
+        asking again later gets new text.
+        """
+        return await self._inflight_prompts.run(ContentCache._generate_key('prompt', prompt), generate)
+    
+    @_retry_generation
     async def _regenerate_hero(
         self,
-        context: Dict[str, Any],
+        ctx: _RegenerationContext,
         preferences: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Regenerate hero tagline with preferences."""
         
-        # Rate limiting
-        await self.rate_limiter.acquire()
-        
         tone = preferences.get('tone', ToneStyle.PROFESSIONAL.value)
         style = preferences.get('style', 'action-oriented')
         avoid = preferences.get('avoid', [])
         
-        user_profile = context.get('user_profile', {})
-        current_tagline = context.get('current_content', {}).get('tagline', '')
+        current_tagline = (ctx.current or {}).get('tagline', '')
         
         avoid_str = ', '.join(avoid) if avoid else 'none specified'
         
-        prompt = f"""Generate an alternative hero tagline that's different from the current one.
-
-Current Tagline: {current_tagline}
-
-Context:
-- Name: {user_profile.get('name', 'Professional')}
-- Skills: {', '.join(user_profile.get('skills', [])[:5])}
-- Title: {user_profile.get('title', '')}
-
-    # ------------------------------------------------------------------
-    # PROMPT ENGINE (SCHEMA-AWARE)
-    # ------------------------------------------------------------------
-
-Requirements:
-- {self.config.hero_min_words}-{self.config.hero_max_words} words
-- Significantly different from current tagline
-- Match the {tone} tone
-- {style} style
-- NO clichés
-- NO introductory phrases
-
-Return ONLY the new tagline."""
+        # Static instructions first, per-request fields last (keeps the prefix cacheable)
+        prompt = _REGEN_HERO_PROMPT_PREFIX + _REGEN_HERO_PROMPT_CONTEXT.format(
+            min_words=self.config.hero_min_words,
+            max_words=self.config.hero_max_words,
+            tone=tone,
+            style=style,
+            avoid=avoid_str,
+            name=ctx.name or 'Professional',
+            skills=', '.join(ctx.skills[:5]),
+            title=ctx.title or '',
+            current_tagline=current_tagline
+        )
         
-        try:
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+        async def generate() -> str:
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
@@ -978,16 +2151,21 @@ Return ONLY the new tagline."""
             new_tagline = self._clean_tagline(response.strip())
             
             # Validate
-            if not self.validator.validate_hero_tagline(new_tagline, self.config):
-                raise ContentValidationError("Generated tagline failed validation")
+            accepted = self._accept_tagline(new_tagline)
+            if accepted is None:
+                raise ContentValidationError("Generated tagline failed validation", content=new_tagline)
             
             self._generation_count += 1
+            return accepted
+        
+        try:
+            new_tagline = await self._generate_once_for_prompt(prompt, generate)
             
             return {
-                'name': user_profile.get('name'),
+                'name': ctx.name,
                 'tagline': new_tagline,
-                'email': user_profile.get('email'),
-                'title': user_profile.get('title')
+                'email': ctx.email,
+                'title': ctx.title
             }
             
         except asyncio.TimeoutError:
@@ -997,97 +2175,38 @@ Return ONLY the new tagline."""
             logger.error("Hero regeneration error: %s", str(e))
             raise
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @_retry_generation
     async def _regenerate_bio(
         self,
-        schema: Dict[str, Any],
-        profile: Dict[str, Any],
+        ctx: _RegenerationContext,
+        preferences: Dict[str, Any]
     ) -> str:
-        return f"""
-You are an AI portfolio content generator.
-
-You will be given:
-1. A STRUCTURED SCHEMA produced by another system
-2. A USER PROFILE with factual data
-
-Your job:
-Convert the schema into FINAL, polished portfolio content.
-
-STRICT RULES:
-- Output ONLY valid JSON
-- No markdown, no explanations, no comments
-- Do NOT change schema intent
-- Do NOT invent experience, metrics, or facts
-- Use schema as authoritative guidance
-
-TARGET OUTPUT FORMAT:
-{{
-  "hero": {{
-    "name": string,
-    "tagline": string (max 100 chars),
-    "bio_short": string,
-    "avatar_url": null
-  }},
-  "bio_long": string (min 150 words),
-  "projects": [
-    {{
-      "title": string,
-      "description": string (min 50 chars),
-      "tech_stack": [string],
-      "featured": boolean,
-      "link": null
-    }}
-  ],
-  "skills": [
-    {{
-      "category": string,
-      "items": [string]
-    }}
-  ],
-  "theme": {{
-    "primary_color": "#RRGGBB",
-    "style": "modern_tech" | "minimalist" | "creative"
-  }},
-  "quality_score": number between 0 and 1
-}}
-
-SCHEMA (instructional, DO NOT MODIFY STRUCTURE):
-{json.dumps(schema, indent=2)}
-
-USER PROFILE (facts only):
-{json.dumps(profile, indent=2)}
-
-CONTENT GUIDELINES:
-- Professional, confident, human
-- Action-oriented language
-- No clichés ("passionate", "innovative", etc.)
-- Expand reference_points into natural prose
-- Respect layout_hints.density for verbosity
-- Highlight higher priority projects more strongly
-
-Generate the JSON now.
-"""
-
-    # ------------------------------------------------------------------
-    # UTILITIES
-    # ------------------------------------------------------------------
-
-    def _extract_json(self, text: str) -> str:
-        text = text.strip()
-
-Return ONLY the rewritten bio."""
+        """Regenerate bio with preferences."""
         
-        try:
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+        tone = preferences.get('tone', ToneStyle.PROFESSIONAL.value)
+        length = preferences.get('length', 'medium')
+        focus = preferences.get('focus', [])
+        
+        current_bio = ctx.current or ''
+        
+        length_map = {
+            'short': '100-150',
+            'medium': '150-200',
+            'long': '200-250'
+        }
+        
+        # Static instructions first, per-request fields last (keeps the prefix cacheable)
+        prompt = _REGEN_BIO_PROMPT_PREFIX + _REGEN_BIO_PROMPT_CONTEXT.format(
+            word_range=length_map.get(length, '150-200'),
+            tone=tone,
+            focus=', '.join(focus) if focus else 'overall strengths',
+            name=ctx.name or 'Professional',
+            skills=', '.join(ctx.skills[:8]) or 'Not specified',
+            current_bio=current_bio
+        )
+        
+        async def generate() -> str:
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
@@ -1099,8 +2218,10 @@ Return ONLY the rewritten bio."""
                 logger.warning("Regenerated bio failed validation, using anyway")
             
             self._generation_count += 1
-            
             return new_bio
+        
+        try:
+            return await self._generate_once_for_prompt(prompt, generate)
             
         except asyncio.TimeoutError:
             logger.error("Bio regeneration timed out")
@@ -1109,27 +2230,18 @@ Return ONLY the rewritten bio."""
             logger.error("Bio regeneration error: %s", str(e))
             raise
     
-    @retry(
-        retry=retry_if_exception_type((Exception,)),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-        reraise=True
-    )
+    @_retry_generation
     async def _regenerate_project(
         self,
-        context: Dict[str, Any],
+        ctx: _RegenerationContext,
         preferences: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Regenerate project description with preferences."""
         
-        # Rate limiting
-        await self.rate_limiter.acquire()
-        
         emphasis = preferences.get('emphasis', EmphasisType.TECHNICAL.value)
         length = preferences.get('length', 'medium')
         
-        current_project = context.get('current_content', {})
+        current_project = ctx.current or {}
         
         length_map = {
             'short': '80-100',
@@ -1138,31 +2250,28 @@ Return ONLY the rewritten bio."""
         }
         
         word_range = length_map.get(length, '100-130')
+        technologies = current_project.get('technologies', [])
         
-        prompt = f"""Rewrite this project description with a different emphasis.
-
-        start = text.find("{")
-        end = text.rfind("}")
-
-        if start == -1 or end == -1:
-            raise RuntimeError("No JSON object found in Gemini response")
-
-        return text[start:end + 1]
-
-Return ONLY the new description."""
+        # Static instructions first, per-request fields last (keeps the prefix cacheable)
+        prompt = _REGEN_PROJECT_PROMPT_PREFIX + _REGEN_PROJECT_PROMPT_CONTEXT.format(
+            word_range=word_range,
+            emphasis=emphasis,
+            title=current_project.get('title', ''),
+            technologies=', '.join(technologies) if technologies else 'Not specified',
+            current_description=current_project.get('description', '')
+        )
         
-        try:
-            response = await asyncio.wait_for(
-                self._generate_content_async(prompt),
-                timeout=self.config.generation_timeout
-            )
+        async def generate() -> str:
+            response = await self._generate_content_async(prompt)
             
             if not response:
                 raise GenerationError("Empty response from model")
             
-            new_description = self._clean_description(response.strip())
-            
             self._generation_count += 1
+            return self._clean_description(response.strip())
+        
+        try:
+            new_description = await self._generate_once_for_prompt(prompt, generate)
             
             return {
                 **current_project,
@@ -1175,6 +2284,47 @@ Return ONLY the new description."""
         except Exception as e:
             logger.error("Project regeneration error: %s", str(e))
             raise
+
+    # ------------------------------------------------------------------
+    # PROMPT ENGINE (SCHEMA-AWARE)
+    # ------------------------------------------------------------------
+
+    def _build_prompt(
+        self,
+        schema: Dict[str, Any],
+        profile: Dict[str, Any],
+    ) -> str:
+        """Full-portfolio prompt: fixed rules and output format, then the schema and profile."""
+        return _SCHEMA_PROMPT_PREFIX + _SCHEMA_PROMPT_CONTEXT.format(
+            schema=_compact_json(schema),
+            profile=_compact_json(profile)
+        )
+
+    # ------------------------------------------------------------------
+    # UTILITIES
+    # ------------------------------------------------------------------
+
+    def _extract_json(self, text: str) -> str:
+        text = text.strip()
+
+        # raw_decode stops where the JSON value ends, so prose or a closing
+        # fence after it is ignored (and the text is only scanned once)
+        start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+        if start != -1:
+            try:
+                _, end = _JSON_DECODER.raw_decode(text, start)
+                return text[start:end]
+            except json.JSONDecodeError:
+                pass
+
+        # Fallback: outermost braces
+        start = text.find("{")
+        end = text.rfind("}")
+
+        if start == -1 or end == -1:
+            raise RuntimeError("No JSON object found in Gemini response")
+
+        return text[start:end + 1]
     
     async def health_check(self) -> Dict[str, Any]:
         """
@@ -1187,10 +2337,7 @@ Return ONLY the new description."""
             # Try a simple generation to test API
             test_prompt = "Say 'OK' if you can respond."
             
-            response = await asyncio.wait_for(
-                self._generate_content_async(test_prompt),
-                timeout=10.0
-            )
+            response = await self._generate_content_async(test_prompt, timeout=10.0)
             
             api_status = 'ok' if response else 'error'
             
@@ -1240,5 +2387,18 @@ Return ONLY the new description."""
             await self.cache.clear()
             logger.info("Cache cleared")
     
+    async def aclose(self) -> None:
+        """
+        Drop this agent's Gemini clients. The connection pools are shared by
+        every agent on a loop; close_http_clients() closes them at shutdown.
+        """
+        self._clients.clear()
+    
+    async def __aenter__(self) -> "GenerationAgent":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
     def __repr__(self) -> str:
-        return f"GenerationAgent(model={self.model.model_name})"
+        return f"GenerationAgent(model={self.model_name})"
@@ -13,9 +13,12 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
 from typing import Any, Dict, Optional, Tuple
 
+from agents.generation.generation_agent import close_http_clients
 from agents.orchestrator.orchestrator_agent import get_orchestrator, PortfolioOrchestrator
+from agents.validation.input import InputValidationError, validate_resume_input
 
 # Logging
 
@@ -55,21 +58,10 @@ def validate_input(parsed_data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     Lightweight validation before running the pipeline.
     """
 
-    if not isinstance(parsed_data, dict):
-        return False, "parsed_data must be a dictionary"
-
-    if not parsed_data.get("name") and not parsed_data.get("email"):
-        return False, "At least one of 'name' or 'email' is required"
-
-    has_core_content = any(
-        parsed_data.get(key)
-        for key in ("skills", "projects", "experience")
-    )
-
-    if not has_core_content:
-        return False, (
-            "At least one of 'skills', 'projects', or 'experience' must be provided"
-        )
+    try:
+        validate_resume_input(parsed_data)
+    except InputValidationError as exc:
+        return False, str(exc)
 
     return True, None
 
@@ -84,23 +76,20 @@ async def generate_portfolio(
     Generate a complete portfolio configuration from parsed resume data.
     """
 
-    is_valid, error = validate_input(parsed_data)
-    if not is_valid:
-        logger.warning("Input validation failed: %s", error)
-        raise ValidationError(error)
-
     try:
         logger.info("Starting portfolio generation")
 
         # FIX: await get_orchestrator
         orchestrator: PortfolioOrchestrator = await get_orchestrator(config)
-        portfolio = await orchestrator.process_resume(parsed_data)
+        # run() checks the input (validate_resume_input) before any stage runs
+        portfolio = await orchestrator.run(parsed_data)
 
         logger.info("Portfolio generation completed successfully")
         return portfolio
 
-    except ValidationError:
-        raise
+    except InputValidationError as exc:
+        logger.warning("Input validation failed: %s", exc)
+        raise ValidationError(str(exc)) from exc
 
     except Exception as exc:
         logger.exception("Portfolio generation failed")
@@ -174,19 +163,32 @@ async def export_portfolio(
 
 
 # Sync Wrappers 
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """The event loop behind the sync wrappers, started in a daemon thread on first use."""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="agents-sync-loop", daemon=True).start()
+            _sync_loop = loop
+    return _sync_loop
+
+
 def _run_async(coro):
     """
     Safe asyncio runner for sync contexts.
-    """
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
-
-    if loop and loop.is_running():
-        return asyncio.run_coroutine_threadsafe(coro, loop).result()
 
-    return asyncio.run(coro)
+    Every call runs on the same long-lived loop, so loop-bound state (the
+    shared orchestrators' HTTP connection pools, rate limiters) carries over
+    between calls instead of being rebuilt by asyncio.run() each time. Works
+    from threads that are already running a loop of their own, too.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_sync_loop()).result()
 
 
 def generate_portfolio_sync(
@@ -213,3 +215,17 @@ def export_portfolio_sync(
     config: Optional[Dict[str, Any]] = None,
 ) -> str:
     return _run_async(export_portfolio(portfolio, format, config))
+
+
+# Shutdown
+
+async def close_agents() -> None:
+    """
+    Close the agents' pooled Gemini connections, on the calling loop and on
+    the sync wrappers' loop if it was started. Call on application shutdown.
+    """
+    await close_http_clients()
+    if _sync_loop is not None:
+        await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(close_http_clients(), _sync_loop)
+        )
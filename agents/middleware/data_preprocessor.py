@@ -13,6 +13,7 @@ Clean, predictable dict → SchemaBuilderAgent
 """
 
 import logging
+import sys
 from typing import Dict, Any, List
 
 logger = logging.getLogger("agents.middleware.data_preprocessor")
@@ -33,7 +34,7 @@ class DataPreprocessor:
     Minimal, deterministic resume preprocessor.
 
     Responsibilities:
-    - Enforce minimum viable input
+    - Reject non-dict input (content rules: agents.validation.input)
     - Normalize text
     - Normalize & deduplicate skills
     - Normalize projects
@@ -57,6 +58,10 @@ class DataPreprocessor:
         "git": "Git",
     }
 
+    # Alias -> (canonical name, its lowercase dedup key), built once at class load.
+    # Names are interned so every resume shares one object per skill.
+    _SKILL_LOOKUP = {alias: (sys.intern(name), name.lower()) for alias, name in SKILL_MAP.items()}
+
     async def preprocess(self, raw: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize raw resume data.
@@ -67,15 +72,10 @@ class DataPreprocessor:
         - safe for SchemaBuilderAgent
         """
 
+        # Content rules are checked once at the boundary (validate_resume_input)
         if not isinstance(raw, dict):
             raise InputValidationError("Resume input must be a dictionary")
 
-        if not raw.get("name") and not raw.get("email"):
-            raise InputValidationError("Missing identifier: name or email required")
-
-        if not any(raw.get(k) for k in ("skills", "projects", "experience", "summary")):
-            raise InputValidationError("Resume has no usable content")
-
         clean = {
             "name": self._clean_text(raw.get("name", "Portfolio")),
             "email": self._clean_email(raw.get("email")),
@@ -114,14 +114,21 @@ class DataPreprocessor:
 
         seen = set()
         normalized: List[str] = []
+        lookup = self._SKILL_LOOKUP
 
         for skill in skills:
             s = str(skill).strip()
             if len(s) < 2:
                 continue
 
-            mapped = self.SKILL_MAP.get(s.lower(), s.title())
-            key = mapped.lower()
+            # Known aliases come with a precomputed key; title-case only on a miss
+            hit = lookup.get(s.lower())
+            if hit:
+                mapped, key = hit
+            else:
+                # Interned: the same unlisted skill recurs across many resumes
+                mapped = sys.intern(s.title())
+                key = mapped.lower()
 
             if key not in seen:
                 seen.add(key)
@@ -1 +1 @@
-from .orchestrator_agent import PortfolioOrchestrator, get_orchestrator, OrchestratorConfig, ProcessingStatus
+from .orchestrator_agent import PortfolioOrchestrator, PipelineError, get_orchestrator
@@ -6,19 +6,31 @@ Minimal coordinator for Showcase agent pipeline.
 Pipeline:
 1. Data preprocessing
 2. Schema building
-3. Content generation
+3. Content generation (sections checked as they arrive)
 4. Validation
 """
 
 import asyncio
+import contextlib
+import copy
+import functools
+import html
+import json
 import logging
+import time
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import orjson  # Optional: faster JSON export
+except ImportError:
+    orjson = None
 
 from agents.middleware.data_preprocessor import DataPreprocessor
-from agents.core.schema_builder import SchemaBuilder
-from agents.generation.generation_agent import ContentGenerator
-from agents.validation.validation_agent import ValidationAgent as PortfolioValidator
+from agents.core.schema_builder import SchemaBuilderAgent
+from agents.generation.generation_agent import GenerationAgent
+from agents.validation.input import validate_resume_input
+from agents.validation.validation_agent import PortfolioValidator
 
 logger = logging.getLogger("agents.orchestrator")
 logger.setLevel(logging.INFO)
@@ -34,10 +46,13 @@ class PortfolioOrchestrator:
     Minimal portfolio generation orchestrator.
     """
 
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+
         self.preprocessor = DataPreprocessor()
         self.schema_builder = SchemaBuilderAgent()
-        self.generator = GenerationAgent()
+        # Optional GenerationConfig overrides under the "generation" key
+        self.generator = GenerationAgent(self.config.get("generation"))
         self.validator = PortfolioValidator()
 
         logger.info("PortfolioOrchestrator initialized")
@@ -49,9 +64,11 @@ class PortfolioOrchestrator:
     ) -> Dict[str, Any]:
         """
         Run the full portfolio pipeline.
-        """
 
-        self._validate_input(parsed_data)
+        Raises InputValidationError (unwrapped) if `parsed_data` fails
+        validate_resume_input; later stages trust their input.
+        """
+        validate_resume_input(parsed_data)
 
         try:
             # 1. Preprocess
@@ -62,13 +79,9 @@ class PortfolioOrchestrator:
             logger.info("Stage 2: Schema building")
             schema = await self.schema_builder.build_schema(profile)
 
-            # 3. Generate content
+            # 3. Generate content, checking each section as it arrives
             logger.info("Stage 3: Content generation")
-            portfolio = await self.generator.generate(
-                schema=schema,
-                user_data=profile,
-                preferences=user_preferences
-            )
+            portfolio = await self._generate_checked(schema, profile, user_preferences)
 
             # 4. Validate output
             logger.info("Stage 4: Validation")
@@ -78,7 +91,7 @@ class PortfolioOrchestrator:
             )
 
             portfolio["metadata"] = {
-                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
                 "pipeline": "showcase-ai",
                 "status": "completed",
             }
@@ -89,19 +102,165 @@ class PortfolioOrchestrator:
             logger.error("Pipeline failed", exc_info=True)
             raise PipelineError(str(e)) from e
 
+    async def regenerate_section(
+        self,
+        current_portfolio: Dict[str, Any],
+        section: str,
+        preferences: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Regenerate one section ("hero", "bio" or "projects.<index>") and
+        return a copy of the portfolio with that section replaced.
+        """
+        name, _, index = section.partition(".")
+        hero = current_portfolio.get("hero") or {}
+        user_profile = {
+            "name": hero.get("name"),
+            "title": hero.get("title"),
+            "email": hero.get("email"),
+            "skills": current_portfolio.get("skills", []),
+        }
+
+        if name in ("hero", "bio"):
+            current = current_portfolio.get(name)
+        elif name == "projects" and index.isdigit() and int(index) < len(current_portfolio.get("projects", [])):
+            current = current_portfolio["projects"][int(index)]
+        else:
+            raise ValueError(f"Unknown section for regeneration: {section}")
+
+        content = await self.generator.regenerate_section(
+            section,
+            {"user_profile": user_profile, "current_content": current},
+            preferences,
+        )
+
+        portfolio = dict(current_portfolio)
+        if name == "projects":
+            portfolio["projects"] = list(portfolio["projects"])
+            portfolio["projects"][int(index)] = content
+        else:
+            portfolio[name] = content
+        portfolio["metadata"] = {
+            **(portfolio.get("metadata") or {}),
+            "last_updated": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        }
+        return portfolio
+
+    async def export_portfolio(self, portfolio: Dict[str, Any], format: str = "json") -> str:
+        """Serialize a portfolio as "json", "yaml" or "html_preview"."""
+        if format == "json":
+            if orjson is not None:
+                return orjson.dumps(
+                    portfolio, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode("utf-8")
+            return json.dumps(portfolio, indent=2, ensure_ascii=False, default=str)
+
+        if format == "yaml":
+            try:
+                import yaml
+            except ImportError:
+                raise PipelineError("PyYAML is not installed")
+            return yaml.safe_dump(portfolio, allow_unicode=True, sort_keys=False)
+
+        if format == "html_preview":
+            return self._render_html_preview(portfolio)
+
+        raise ValueError(f"Unsupported export format: {format}")
+
     # Helpers
 
-    def _validate_input(self, data: Dict[str, Any]) -> None:
-        if not isinstance(data, dict) or not data:
-            raise PipelineError("Input must be a non-empty dictionary")
+    @staticmethod
+    def _render_html_preview(portfolio: Dict[str, Any]) -> str:
+        """A single self-contained page for previewing the generated content."""
+        def esc(value: Any) -> str:
+            return html.escape(str(value or ""))
+
+        hero = portfolio.get("hero") or {}
 
-        if not (data.get("name") or data.get("email")):
-            raise PipelineError("Input must contain name or email")
+        parts = [
+            f"<header><h1>{esc(hero.get('name') or 'Portfolio')}</h1>"
+            f"<p>{esc(hero.get('tagline'))}</p></header>"
+        ]
+        if portfolio.get("bio"):
+            parts.append(f"<section><h2>About</h2><p>{esc(portfolio['bio'])}</p></section>")
+        if portfolio.get("skills"):
+            skills = "".join(f"<li>{esc(skill)}</li>" for skill in portfolio["skills"])
+            parts.append(f"<section><h2>Skills</h2><ul>{skills}</ul></section>")
+        if portfolio.get("projects"):
+            projects = "".join(
+                f"<article><h3>{esc(p.get('title'))}</h3><p>{esc(p.get('description'))}</p></article>"
+                for p in portfolio["projects"]
+            )
+            parts.append(f"<section><h2>Projects</h2>{projects}</section>")
 
-        if not any([
-            data.get("skills"),
-            data.get("projects"),
-            data.get("experience"),
-            data.get("education")
-        ]):
-            raise PipelineError("Input lacks meaningful content")
+        return (
+            '<!DOCTYPE html>\n<html lang="en">\n<head><meta charset="UTF-8">'
+            f"<title>{esc(hero.get('name') or 'Portfolio')}</title></head>\n"
+            f"<body>{''.join(parts)}</body>\n</html>\n"
+        )
+
+    async def _generate_checked(
+        self,
+        schema: Dict[str, Any],
+        profile: Dict[str, Any],
+        user_preferences: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Collect the generated sections, running the validator's per-section
+        check on each while the rest are still generating. A hard failure
+        closes the stream, which cancels the calls still in flight.
+        """
+        start_ns = time.perf_counter_ns()
+        sections = {}
+
+        stream = self.generator.generate_stream(schema, profile, user_preferences)
+        async with contextlib.aclosing(stream):
+            async for section, content in stream:
+                self.validator.check_section(section, content)
+                sections[section] = content
+
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
+        return self.generator.assemble_portfolio(schema, profile, sections, duration)
+
+
+# Shared instances
+
+def _hashable(value: Any) -> Any:
+    """Recursively convert a config value into a hashable, key-order-independent form."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_hashable(v) for v in value)
+    return value
+
+
+class _ConfigKey:
+    """Cache key comparing configs by content while carrying the config itself."""
+
+    __slots__ = ("config", "_key")
+
+    def __init__(self, config: Dict[str, Any]):
+        # Copied so later mutation by the caller can't change a cached orchestrator's config
+        self.config = copy.deepcopy(config)
+        self._key = _hashable(self.config)
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ConfigKey) and self._key == other._key
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_orchestrator(key: _ConfigKey) -> PortfolioOrchestrator:
+    return PortfolioOrchestrator(key.config)
+
+
+async def get_orchestrator(config: Optional[Dict[str, Any]] = None) -> PortfolioOrchestrator:
+    """
+    Shared PortfolioOrchestrator per distinct config (None and {} are the same).
+    Safe to reuse: agents keep per-run data in arguments, not on the instance.
+    """
+    return _cached_orchestrator(_ConfigKey(config or {}))
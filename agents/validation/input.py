@@ -0,0 +1,37 @@
+"""
+Input checks for the agent pipeline, run once where data enters it
+(PortfolioOrchestrator.run). Later stages trust their input.
+"""
+
+from typing import Any, Dict
+
+
+class InputValidationError(ValueError):
+    """Raised when parsed resume data can't produce a portfolio."""
+    pass
+
+
+# At least one must be non-empty for there to be anything to generate from
+CONTENT_KEYS = ("skills", "projects", "experience", "summary")
+
+
+def validate_resume_input(data: Any) -> Dict[str, Any]:
+    """
+    Check parsed resume data and return it unchanged.
+
+    Raises:
+        InputValidationError: If it isn't a non-empty dict with an identifier
+            (name or email) and some content
+    """
+    if not isinstance(data, dict) or not data:
+        raise InputValidationError("parsed_data must be a non-empty dictionary")
+
+    if not data.get("name") and not data.get("email"):
+        raise InputValidationError("At least one of 'name' or 'email' is required")
+
+    if not any(data.get(key) for key in CONTENT_KEYS):
+        raise InputValidationError(
+            "At least one of 'skills', 'projects', 'experience', or 'summary' must be provided"
+        )
+
+    return data
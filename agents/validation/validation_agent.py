@@ -1,7 +1,30 @@
+import bisect
+import itertools
 import re
-from typing import List
+from typing import Any, Dict, List
 
-from agents.schemas.portfolio import PortfolioOutput
+try:
+    import re2  # Optional: linear-time engine for the placeholder scan (google-re2)
+except ImportError:
+    re2 = None
+
+# Candidate words for the bio hallucination heuristic in _check_consistency
+_WORD_RE = re.compile(r"\b[a-zA-Z]{4,}\b")
+# Whitespace-separated words, as str.split() sees them
+_TOKEN_RE = re.compile(r"\S+")
+
+
+def _count_words(text: str, limit: int) -> int:
+    """
+    Words in `text`, counting no further than `limit`. Enough for range
+    checks, without building split()'s list of every word.
+    """
+    count = 0
+    for _ in _TOKEN_RE.finditer(text):
+        count += 1
+        if count >= limit:
+            break
+    return count
 
 
 class ValidationError(Exception):
@@ -10,24 +33,19 @@ class ValidationError(Exception):
 
 class PortfolioValidator:
     """
-    Validates PortfolioOutput beyond Pydantic structural checks.
+    Validates the generated portfolio dict before it is returned.
 
     Focus:
     - Content quality
     - Reasonable length / tone
     - Placeholder detection
-    - Deterministic scoring
-
-    Pydantic already guarantees:
-    - Required fields
-    - Min/max lengths
-    - Types
+    - Deterministic scoring (portfolios below PASS_SCORE are rejected)
     """
 
     PASS_SCORE = 0.70
 
     PLACEHOLDER_PATTERNS = [
-        r"\[.*?\]",
+        r"\[[^\[\]\n]*\]",  # innermost [...] on a line: linear, unlike \[.*?\]
         r"lorem ipsum",
         r"\b(todo|fixme|tbd)\b",
         r"sample text",
@@ -35,57 +53,48 @@ class PortfolioValidator:
         r"your (name|project|company)",
     ]
 
-    def validate_and_enhance(
-        self,
-        portfolio: PortfolioOutput,
-        original_data: dict | None = None,
-    ) -> dict:
-        """
-        Validate generated portfolio and attach validation metadata.
-        """
+    # All of the above as one alternation: a single case-insensitive scan per
+    # text, on RE2 when installed (inline (?i) works on either engine)
+    _PLACEHOLDER_RE = (re2 or re).compile(
+        "(?i)" + "|".join(f"(?:{p})" for p in PLACEHOLDER_PATTERNS)
+    )
 
-        hero_score = self._validate_hero(portfolio.hero)
-        bio_score = self._validate_bio(portfolio.bio_long)
-        project_score = self._validate_projects(portfolio.projects)
+    _FIRST_PERSON_RE = re.compile(r"\b(?:i|my|i['’]m|i['’]ve)\b", re.IGNORECASE)
 
-        overall = (
-            hero_score * 0.25 +
-            bio_score * 0.35 +
-            project_score * 0.40
-        )
-
-        passed = overall >= self.PASS_SCORE
-
-        result = portfolio.model_dump()
-
-        result["quality_score"] = round(overall, 3)
-        result["validation"] = {
-            "hero_score": round(hero_score, 3),
-            "bio_score": round(bio_score, 3),
-            "projects_score": round(project_score, 3),
-            "passed": passed,
-        }
-
-        if not passed:
-            raise ValidationError(
-                f"Portfolio quality below threshold ({overall:.2f})"
-            )
-
-        return result
+    def check_section(self, section: str, content) -> None:
+        """
+        Hard-failure check on one freshly generated section (the plain
+        dicts/strings GenerationAgent.generate_stream yields).
+        Cheap enough to run while the other sections are still generating.
+        """
+        if section == "hero":
+            texts = [content.get("tagline", "")]
+        elif section == "bio":
+            texts = [content]
+        elif section == "projects":
+            texts = [p.get("description", "") for p in content]
+        else:
+            return
+
+        for text in texts:
+            if text and self._has_placeholders(text):
+                raise ValidationError(f"Placeholder text in generated {section}")
 
     # SECTION VALIDATORS
 
-    def _validate_hero(self, hero) -> float:
+    def _validate_hero(self, hero: Dict[str, Any]) -> float:
         score = 1.0
+        tagline = hero.get("tagline") or ""
 
-        wc = len(hero.tagline.split())
+        wc = _count_words(tagline, 19)
         if wc < 6 or wc > 18:
             score -= 0.3
 
-        if self._has_placeholders(hero.tagline):
+        if self._has_placeholders(tagline):
             score -= 0.4
 
-        if hero.bio_short and len(hero.bio_short.split()) < 20:
+        bio_short = hero.get("bio_short")
+        if bio_short and _count_words(bio_short, 20) < 20:
             score -= 0.1
 
         return max(score, 0.0)
@@ -104,19 +113,29 @@ class PortfolioValidator:
 
         return max(score, 0.0)
 
-    def _validate_projects(self, projects: List) -> float:
+    def _validate_projects(self, projects: List[Dict[str, Any]]) -> float:
         if not projects:
             return 0.4
 
+        # One placeholder scan over every description. No pattern can match
+        # across the "\n" joiner, so each hit maps back to one project by offset.
+        descriptions = [p.get("description") or "" for p in projects]
+        ends = list(itertools.accumulate(len(d) + 1 for d in descriptions))
+        text = "\n".join(descriptions)
+        flagged = {
+            bisect.bisect_right(ends, m.start())
+            for m in self._PLACEHOLDER_RE.finditer(text)
+        }
+
         scores = []
 
-        for p in projects:
+        for i, p in enumerate(projects):
             s = 1.0
 
-            if self._has_placeholders(p.description):
+            if i in flagged:
                 s -= 0.4
 
-            if not p.tech_stack:
+            if not (p.get("technologies") or p.get("tech_stack")):
                 s -= 0.1
 
             scores.append(max(s, 0.0))
@@ -126,16 +145,22 @@ class PortfolioValidator:
     # HELPERS
 
     def _has_placeholders(self, text: str) -> bool:
-        text = text.lower()
-        return any(re.search(p, text) for p in self.PLACEHOLDER_PATTERNS)
+        return self._PLACEHOLDER_RE.search(text) is not None
 
     def _is_first_person(self, text: str) -> bool:
-        t = text.lower()
-        return any(p in t for p in [" i ", " my ", " i'm ", " i've "])
+        return self._FIRST_PERSON_RE.search(text) is not None
 
     def _is_repetitive(self, text: str) -> bool:
-        sentences = [s.strip().lower() for s in text.split(".") if s.strip()]
-        return len(sentences) != len(set(sentences))
+        # Stops at the first repeated sentence
+        seen = set()
+        for sentence in text.split("."):
+            sentence = sentence.strip().lower()
+            if not sentence:
+                continue
+            if sentence in seen:
+                return True
+            seen.add(sentence)
+        return False
 
     def _check_consistency(
         self, portfolio: Dict[str, Any], original: Dict[str, Any]
@@ -145,16 +170,17 @@ class PortfolioValidator:
         if portfolio.get("hero", {}).get("name") != original.get("name"):
             warnings.append("Hero name does not match original data")
 
-        original_skills = set(s.lower() for s in original.get("skills", []))
+        original_skills = frozenset(str(s).lower() for s in original.get("skills", ()))
         bio = portfolio.get("bio", "").lower()
 
-        hallucinated = [
-            word for word in re.findall(r"\b[a-zA-Z]{4,}\b", bio)
-            if word not in original_skills
-        ]
-
-        if len(hallucinated) > 15:
-            warnings.append("Possible skill hallucination in bio")
+        # Streamed, stopping as soon as the threshold is crossed
+        unknown = 0
+        for match in _WORD_RE.finditer(bio):
+            if match.group() not in original_skills:
+                unknown += 1
+                if unknown > 15:
+                    warnings.append("Possible skill hallucination in bio")
+                    break
 
         if len(portfolio.get("projects", [])) > len(original.get("projects", [])):
             warnings.append("Generated more projects than provided")
@@ -165,19 +191,32 @@ class PortfolioValidator:
         self, generated_content: Dict[str, Any], original_data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
-        Adapter method for Orchestrator compatibility.
+        Orchestrator entry point for the generated (dict) portfolio.
+
+        Hard failures were already caught per section by check_section();
+        this scores the whole portfolio, raising ValidationError below
+        PASS_SCORE, and attaches the scores and consistency warnings.
         """
-        state = {
-            "generated_content": generated_content,
-            "clean_data": original_data,
+        hero_score = self._validate_hero(generated_content.get("hero") or {})
+        bio_score = self._validate_bio(generated_content.get("bio") or "")
+        project_score = self._validate_projects(generated_content.get("projects") or [])
+
+        overall = (
+            hero_score * 0.25 +
+            bio_score * 0.35 +
+            project_score * 0.40
+        )
+
+        if overall < self.PASS_SCORE:
+            raise ValidationError(
+                f"Portfolio quality below threshold ({overall:.2f})"
+            )
+
+        generated_content["quality_score"] = round(overall, 3)
+        generated_content["validation"] = {
+            "hero_score": round(hero_score, 3),
+            "bio_score": round(bio_score, 3),
+            "projects_score": round(project_score, 3),
+            "warnings": self._check_consistency(generated_content, original_data or {}),
         }
-        
-        # Reuse existing run logic
-        try:
-            await self.run(state)
-        except ValidationError:
-            if self.strict:
-                raise
-            # If not strict, we continue but mark valid=False inside run()
-            
         return generated_content
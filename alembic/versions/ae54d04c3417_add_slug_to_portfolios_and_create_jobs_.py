@@ -17,23 +17,36 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+# Columns and indexes of both tables in one round trip (instead of one
+# inspector query per lookup); a table with no column rows doesn't exist
+_EXISTING_SCHEMA_SQL = sa.text("""
+    SELECT 'column' AS kind, table_name AS table_name, column_name AS name
+    FROM information_schema.columns
+    WHERE table_schema = current_schema() AND table_name IN ('portfolios', 'jobs')
+    UNION ALL
+    SELECT 'index', tablename, indexname
+    FROM pg_indexes
+    WHERE schemaname = current_schema() AND tablename IN ('portfolios', 'jobs')
+""")
+
 
 def upgrade() -> None:
-    # Check if slug column exists before adding
     connection = op.get_bind()
-    inspector = sa.inspect(connection)
-    portfolios_columns = [col['name'] for col in inspector.get_columns('portfolios')]
+    columns = {'portfolios': set(), 'jobs': set()}
+    indexes = {'portfolios': set(), 'jobs': set()}
+    for kind, table_name, name in connection.execute(_EXISTING_SCHEMA_SQL):
+        (columns if kind == 'column' else indexes)[table_name].add(name)
+    
+    # Check if slug column exists before adding
+    portfolios_columns = columns['portfolios']
     
     # Add slug column to portfolios table (if it doesn't exist)
     if 'slug' not in portfolios_columns:
         op.add_column('portfolios', sa.Column('slug', sa.String(), nullable=True))
         op.create_index(op.f('ix_portfolios_slug'), 'portfolios', ['slug'], unique=True)
     
-    # Check if jobs table exists
-    tables = inspector.get_table_names()
-    
     # Create jobs table (if it doesn't exist)
-    if 'jobs' not in tables:
+    if not columns['jobs']:
         op.create_table(
             'jobs',
             sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
@@ -62,7 +75,7 @@ def upgrade() -> None:
         op.create_index(op.f('ix_jobs_created_at'), 'jobs', ['created_at'], unique=False)
     else:
         # Table exists, check if indexes exist
-        jobs_indexes = [idx['name'] for idx in inspector.get_indexes('jobs')]
+        jobs_indexes = indexes['jobs']
         if 'ix_jobs_job_id' not in jobs_indexes:
             op.create_index(op.f('ix_jobs_job_id'), 'jobs', ['job_id'], unique=True)
         if 'ix_jobs_status' not in jobs_indexes:
@@ -73,7 +86,7 @@ def upgrade() -> None:
             op.create_index(op.f('ix_jobs_created_at'), 'jobs', ['created_at'], unique=False)
     
     # Create index on is_published for portfolios (if it doesn't exist)
-    portfolio_indexes = [idx['name'] for idx in inspector.get_indexes('portfolios')]
+    portfolio_indexes = indexes['portfolios']
     if 'ix_portfolios_is_published' not in portfolio_indexes:
         op.create_index(op.f('ix_portfolios_is_published'), 'portfolios', ['is_published'], unique=False)
 
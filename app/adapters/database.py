@@ -1,12 +1,20 @@
 # app/adapters/database.py
 
+import functools
 import logging
-from typing import Generator
+from typing import AsyncGenerator
 
 from sqlmodel import Session, create_engine
 # from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session # Removed Session override
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.core.config import settings
 
@@ -47,21 +55,66 @@ SessionLocal = sessionmaker(
     autocommit=False,
 )
 
+# asyncio drivers for the backends the sync engine is used with
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+# Async engine for the async routes (auth, chat), built on first use so
+# the app still imports if the async driver is missing
+def _async_database_url(url: str) -> URL:
+    """The same database through an asyncio driver (psycopg 3 for PostgreSQL, aiosqlite for SQLite)."""
+    parsed = make_url(url)
+    drivername = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if drivername is not None:
+        return parsed.set(drivername=drivername)
+    return parsed
+
+
+@functools.cache
+def get_async_engine() -> AsyncEngine:
+    url = _async_database_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        # No pool sizing, as for the sync engine
+        return create_async_engine(url, echo=settings.DEBUG)
+
+    # psycopg 3 prepares a statement server-side once it has run
+    # prepare_threshold times on a connection, skipping the re-parse after that
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+
+
+@functools.cache
+def _async_session_factory() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
 # Session Dependency / Provider
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Provides a scoped database session.
+    Provides a scoped async database session (non-blocking on the event loop).
+    Sync routes use app.api.dependencies.get_db instead.
     """
-    session = SessionLocal()
-    try:
-        yield session
-        session.commit()
-    except SQLAlchemyError:
-        session.rollback()
-        logger.exception("Database transaction failed")
-        raise
-    finally:
-        session.close()
+    async with _async_session_factory()() as session:
+        try:
+            yield session
+            await session.commit()
+        except SQLAlchemyError:
+            await session.rollback()
+            logger.exception("Database transaction failed")
+            raise
 
 def close_engine() -> None:
     try:
@@ -69,3 +122,10 @@ def close_engine() -> None:
         logger.info("Database engine disposed successfully")
     except Exception:
         logger.exception("Error while disposing database engine")
+
+
+async def close_async_engine() -> None:
+    """Dispose the async engine, if one was ever created."""
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+        logger.info("Async database engine disposed successfully")
@@ -7,9 +7,21 @@ import json
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
+try:
+    import orjson  # Optional: faster prompt serialization
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
 
+def _prompt_json(data: Any) -> str:
+    """Serialize data for a prompt without indentation (same content, fewer tokens)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
 class GeminiAdapter:
     """
     Adapter for Google Gemini API.
@@ -178,7 +190,7 @@ class GeminiAdapter:
         prompt = f"""
         Review and enhance the following resume data. Return enhanced JSON:
         
-        {json.dumps(structured_data, indent=2)}
+        {_prompt_json(structured_data)}
         
         Improve descriptions, add quantifiable achievements, and enhance professional language.
         """
@@ -197,7 +209,7 @@ class GeminiAdapter:
         prompt = f"""
         Generate a frontend UI JSON specification for displaying this resume:
         
-        {json.dumps(resume_data, indent=2)}
+        {_prompt_json(resume_data)}
         
         Return JSON with theme (colors, fonts) and sections (header, summary, experience, education, skills).
         """
@@ -219,7 +231,7 @@ class GeminiAdapter:
         prompt = f"""
         Validate and fix the following UI JSON specification. Return corrected JSON:
         
-        {json.dumps(ui_json, indent=2)}
+        {_prompt_json(ui_json)}
         
         Ensure all required fields are present and valid.
         """
@@ -1,3 +1,9 @@
+import base64
+import calendar
+import functools
+import hashlib
+import hmac
+import json
 import logging
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, Depends
@@ -30,6 +36,25 @@ class AuthResponse(BaseModel):
     user: UserRead
 
 
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _json_segment(obj: dict) -> bytes:
+    # Same compact encoding jose uses, so tokens are byte-identical
+    return _b64url(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+@functools.lru_cache(maxsize=1)
+def _hs256_signer(secret_key: str) -> tuple[bytes, "hmac.HMAC"]:
+    """
+    Encoded JWT header and a keyed HMAC-SHA256 context, built once per key.
+    Each token copies the context instead of re-running the key setup.
+    """
+    header = _json_segment({"alg": "HS256", "typ": "JWT"})
+    return header, hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+
+
 def create_access_token(user_id: int) -> str:
     """Create a JWT access token for the user."""
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -38,7 +63,16 @@ def create_access_token(user_id: int) -> str:
         "exp": expire,
         "type": "access",
     }
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    if settings.JWT_ALGORITHM != "HS256":
+        return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+    # HS256 fast path: sign with the cached header and HMAC context
+    to_encode["exp"] = calendar.timegm(expire.utctimetuple())
+    header, signer = _hs256_signer(settings.SECRET_KEY)
+    signing_input = header + b"." + _json_segment(to_encode)
+    mac = signer.copy()
+    mac.update(signing_input)
+    return (signing_input + b"." + _b64url(mac.digest())).decode("ascii")
 
 
 @router.post("/github/callback", response_model=AuthResponse)
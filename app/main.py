@@ -14,7 +14,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app import chat
 from app.api.routes import api_router
 from app.core.config import settings
-from app.adapters.database import engine
+from app.adapters.database import engine, close_async_engine
+from agents.integration import close_agents
 from app.models.portfolio import Portfolio
 from app.models.chat_message import ChatMessage
 from app.models.user import User
@@ -43,6 +44,8 @@ async def lifespan(app: FastAPI):
     
     logger.info("Showcase AI: Application shutting down")
     engine.dispose()
+    await close_async_engine()
+    await close_agents()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,6 +18,11 @@ from typing import Dict, Any, Optional
 from enum import Enum
 from dataclasses import dataclass, field
 
+try:
+    import orjson  # Optional: faster JSON export
+except ImportError:
+    orjson = None
+
 from agents.middleware.data_preprocessor import DataPreprocessor
 from agents.core.schema_builder import SchemaBuilder
 from agents.generation.content_generator import ContentGenerator
@@ -372,6 +377,10 @@ class PortfolioOrchestrator:
     ) -> str:
         """Export portfolio in specified format."""
         if format == 'json':
+            if orjson is not None:
+                return orjson.dumps(
+                    portfolio, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode('utf-8')
             return json.dumps(portfolio, indent=2, ensure_ascii=False)
         
         elif format == 'yaml':
@@ -56,7 +56,7 @@ class AIService:
             logger.info(f"AI Generated Portfolio Data (pre-validation): {json.dumps(portfolio_data, default=str)[:500]}...")
 
             try:
-                validated_data = PortfolioOutput(**portfolio_data)
+                validated_data = PortfolioOutput.model_validate(portfolio_data)
                 logger.info("AI output successfully validated against PortfolioOutput schema")
                 
                 return validated_data.model_dump()
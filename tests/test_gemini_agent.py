@@ -82,4 +82,19 @@ class TestGeminiAgent:
 
         with patch("agno.agent.Agent.run", return_value=fake_response):
             with pytest.raises(ValueError, match="Empty response"):
-                agent.run(mock_context)
\ No newline at end of file
+                agent.run(mock_context)
+
+    def test_run_json_with_surrounding_prose(self, agent, mock_context):
+        """Scenario: LLM adds prose (with stray braces) around the JSON."""
+        fake_response = MagicMock()
+        fake_response.content = (
+            'Here is the profile {as requested}:\n'
+            '{"name": "Arjun", "role": "Dev", "summary": "Builds {APIs} and \\"tools\\""}\n'
+            'Let me know if you need changes {anything else}.'
+        )
+        fake_response.text = fake_response.content
+
+        with patch("agno.agent.Agent.run", return_value=fake_response):
+            agent.run(mock_context)
+
+        assert mock_context.state["profile"]["summary"] == 'Builds {APIs} and "tools"'
@@ -0,0 +1,837 @@
+import pytest
+import asyncio
+import contextlib
+import json
+import sys
+import os
+from tenacity import wait_none
+
+# ------------------- PATH FIX -------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+agents_path = os.path.join(current_dir, "../agents")
+sys.path.insert(0, agents_path)
+# ------------------------------------------------
+
+from agents.generation.generation_agent import (
+    ContentCache,
+    ContentValidationError,
+    GenerationAgent,
+    GenerationError,
+    RateLimitError,
+    RateLimiter,
+    RequestRejectedError,
+    _GenerationContext,
+    _PROJECT_PROMPT_PREFIX,
+    _REGEN_BIO_PROMPT_PREFIX,
+    _RegenerationContext,
+    _SCHEMA_PROMPT_PREFIX,
+    _compact_json,
+    _domain_context,
+    _shared_http_client,
+    _wait_before_retry,
+    close_http_clients,
+)
+from agents.generation import generation_agent
+
+TAGLINE = "Building reliable cloud systems for fast-moving product teams"
+BIO = "I am a backend engineer who designs and operates distributed systems. " * 6
+DESCRIPTION = "Built a payment reconciliation service in Python that matches ledger entries across providers. " * 3
+
+SCHEMA = {
+    "hero": {"name": "Arjun"},
+    "bio": {"key_points": ["distributed systems"]},
+    "skills": ["Python"],
+    "projects": [
+        {"id": "p1", "title": "Ledger", "needs_enhancement": True, "raw_description": "reconciles payments"},
+        {"id": "p2", "title": "Site", "raw_description": "personal site"},
+    ],
+}
+USER_DATA = {"name": "Arjun", "skills": ["Python"]}
+
+
+class TestGenerationAgent:
+
+    @pytest.fixture
+    def agent(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        return GenerationAgent({"enable_cache": False, "generation_timeout": 5})
+
+    def test_validator_checks_length_and_placeholders(self, agent):
+        """Sections outside the word limits or with template leftovers are rejected."""
+        validator = agent.validator
+
+        assert validator.validate_hero_tagline(TAGLINE, agent.config)
+        assert not validator.validate_hero_tagline("Too short", agent.config)
+        assert not validator.validate_hero_tagline("Engineer at [Company] building reliable systems", agent.config)
+        assert validator.validate_bio(BIO, agent.config)
+        assert not validator.validate_bio("Lorem ipsum dolor sit amet. " * 20, agent.config)
+        assert validator.validate_project_description(DESCRIPTION, agent.config)
+        assert not validator.validate_project_description("", agent.config)
+
+    @pytest.mark.asyncio
+    async def test_cache_round_trip(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        cache = GenerationAgent({"enable_cache": True}).cache
+
+        key = cache._generate_key('bio', ('distributed systems',), 'software_engineering')
+        assert key == cache._generate_key('bio', ('distributed systems',), 'software_engineering')
+        assert await cache.get(key) is None
+
+        await cache.set(key, BIO)
+        assert await cache.get(key) == BIO
+        assert await cache.get(cache._generate_key('bio', (), 'software_engineering')) is None
+
+    @pytest.mark.asyncio
+    async def test_generate_runs_sections_concurrently(self, agent):
+        """
+        Scenario: Hero, bio and projects each take a while to generate.
+        Expected: All three calls are in flight at the same time.
+        """
+        running = []
+        peak = []
+
+        def section(result):
+            async def generate(*args, **kwargs):
+                running.append(True)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+                return result
+            return generate
+
+        async def no_combined(*args, **kwargs):
+            return {}
+
+        agent._generate_all_safe = no_combined
+        agent._generate_hero_safe = section({"name": "Arjun", "tagline": TAGLINE})
+        agent._generate_bio_safe = section(BIO)
+        agent._generate_projects_safe = section([])
+
+        portfolio = await agent.generate(SCHEMA, USER_DATA)
+
+        assert max(peak) == 3
+        assert portfolio["hero"]["tagline"] == TAGLINE
+        assert portfolio["bio"] == BIO
+
+    @pytest.mark.asyncio
+    async def test_failed_section_cancels_the_others(self, agent):
+        """
+        Scenario: The hero fails while bio and projects are still running.
+        Expected: generate() raises and the other two calls are cancelled.
+        """
+        cancelled = []
+
+        async def slow(*args, **kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def failing(*args, **kwargs):
+            raise GenerationError("hero failed")
+
+        async def no_combined(*args, **kwargs):
+            return {}
+
+        agent._generate_all_safe = no_combined
+        agent._generate_hero_safe = failing
+        agent._generate_bio_safe = slow
+        agent._generate_projects_safe = slow
+
+        with pytest.raises(GenerationError):
+            await agent.generate(SCHEMA, USER_DATA)
+        await asyncio.sleep(0)
+
+        assert cancelled == [True, True]
+
+    @pytest.mark.asyncio
+    async def test_projects_enhance_concurrently_in_input_order(self, agent):
+        """
+        Scenario: More projects need enhancement than MAX_PARALLEL_PROJECTS.
+        Expected: At most that many calls overlap, and output keeps input order.
+        """
+        running = []
+        peak = []
+
+        async def enhance(title, *args, **kwargs):
+            running.append(title)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(title)
+            return f"Enhanced {title}"
+
+        agent._enhance_project_description_safe = enhance
+        projects = [
+            {"id": f"p{i}", "title": f"Project {i}", "needs_enhancement": True, "raw_description": "draft"}
+            for i in range(8)
+        ]
+        result = await agent._generate_projects_safe(projects, USER_DATA, {})
+
+        assert max(peak) == agent.MAX_PARALLEL_PROJECTS
+        assert [p["description"] for p in result] == [f"Enhanced Project {i}" for i in range(8)]
+
+    @pytest.mark.asyncio
+    async def test_project_prompts_share_a_static_prefix(self, agent):
+        """
+        Scenario: One project is enhanced with its stack in two orders, then another project.
+        Expected: Equal stacks give identical prompts; every prompt opens with the fixed head.
+        """
+        prompts = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            prompts.append(prompt)
+            return DESCRIPTION
+
+        agent._generate_content_async = fake_generate
+        await agent._enhance_project_description("Ledger", "reconciles payments", ["Redis", "Python"], "medium", {})
+        await agent._enhance_project_description("Ledger", "reconciles payments", ["Python", "Redis"], "medium", {})
+        await agent._enhance_project_description("Site", "personal site", ["Hugo"], "short", {})
+
+        assert prompts[0] == prompts[1]
+        assert all(prompt.startswith(_PROJECT_PROMPT_PREFIX) for prompt in prompts)
+        assert "Project Title: Site" in prompts[2]
+
+    @pytest.mark.asyncio
+    async def test_content_cache_digest_keys_and_expiry(self):
+        """Tuples and lists give the same key; entries past their TTL are evicted."""
+        key = ContentCache._generate_key('bio', ('a', 'b'), 'x')
+        assert key == ContentCache._generate_key('bio', ['a', 'b'], 'x')
+        assert len(key) == 32
+
+        cache = ContentCache(ttl=60)
+        await cache.set(key, "first")
+        await cache.set(key, "second")
+        assert await cache.get(key) == "second"
+
+        expired = ContentCache(ttl=0)
+        await expired.set(key, "gone")
+        assert await expired.get(key) is None
+        assert (await expired.get_stats())['size'] == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_sleeps_only_for_the_missing_token(self, monkeypatch):
+        """A full bucket serves a burst at once; the next call waits for one token."""
+        waits = []
+        real_sleep = asyncio.sleep
+
+        async def recording_sleep(delay):
+            waits.append(delay)
+            await real_sleep(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+        limiter = RateLimiter(requests_per_minute=600, burst=2)
+
+        for _ in range(3):
+            await limiter.acquire()
+
+        assert len(waits) == 1
+        assert 0 < waits[0] <= 0.1
+
+    @pytest.mark.parametrize("limits", [
+        {"requests_per_minute": 0},
+        {"requests_per_minute": -5},
+        {"tokens_per_minute": 0},
+    ])
+    def test_rate_limits_must_be_positive(self, monkeypatch, limits):
+        """Zero or negative limits are rejected up front, by the limiter and the agent config."""
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+
+        with pytest.raises(ValueError, match="must be positive"):
+            RateLimiter(**limits)
+        with pytest.raises(ValueError, match="must be positive"):
+            GenerationAgent(limits)
+
+    @pytest.mark.asyncio
+    async def test_project_cache_key_ignores_formatting(self, monkeypatch):
+        """
+        Scenario: The same project is resubmitted with different case, spacing and stack order,
+        then requested at another length.
+        Expected: The copy is a cache hit; the new length is generated again.
+        """
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        agent = GenerationAgent({"generation_timeout": 5})
+        calls = []
+
+        async def enhance(*args, **kwargs):
+            calls.append(args)
+            return DESCRIPTION.strip()
+
+        agent._enhance_project_description = enhance
+        await agent._enhance_project_description_safe("Ledger", "Reconciles  payments", ["Python", "Redis"], "medium", {})
+        await agent._enhance_project_description_safe(" ledger", "reconciles payments ", ["redis", "python"], "medium", {})
+        await agent._enhance_project_description_safe("Ledger", "Reconciles payments", ["Python", "Redis"], "long", {})
+
+        assert len(calls) == 2
+
+    def test_clean_strips_response_preambles(self, agent):
+        """Known preambles are dropped case-insensitively; other openings are kept."""
+        assert agent._clean_tagline('Tagline: "' + TAGLINE + '"') == TAGLINE
+        assert agent._clean_bio("HERE'S THE BIO: " + BIO) == BIO.strip()
+        assert agent._clean_description("The description is: " + DESCRIPTION) == DESCRIPTION.strip()
+        assert agent._clean_description("Here isn't a preamble") == "Here isn't a preamble"
+
+    @pytest.mark.asyncio
+    async def test_generate_uses_single_combined_call(self, agent):
+        """
+        Scenario: The combined JSON response passes validation for every section.
+        Expected: One model call fills hero, bio and the enhanced project.
+        """
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(config is agent.json_generation_config)
+            return json.dumps({
+                "tagline": TAGLINE,
+                "bio": BIO,
+                "projects": [{"id": "p1", "description": DESCRIPTION}],
+            })
+
+        agent._generate_content_async = fake_generate
+        portfolio = await agent.generate(SCHEMA, USER_DATA)
+
+        assert calls == [True]
+        assert portfolio["hero"]["tagline"] == TAGLINE
+        assert portfolio["bio"] == BIO.strip()
+        assert [p["description"] for p in portfolio["projects"]] == [DESCRIPTION.strip(), "personal site"]
+
+    @pytest.mark.asyncio
+    async def test_generate_falls_back_per_section(self, agent):
+        """
+        Scenario: The combined response has a valid tagline but an unusable bio.
+        Expected: Only the missing sections are generated with their own prompts.
+        """
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            if config is agent.json_generation_config:
+                calls.append("combined")
+                return json.dumps({"tagline": TAGLINE, "bio": "Too short."})
+            calls.append("section")
+            return BIO if "bio" in prompt[:120] else DESCRIPTION
+
+        agent._generate_content_async = fake_generate
+        portfolio = await agent.generate(SCHEMA, USER_DATA)
+
+        assert calls[0] == "combined"
+        assert "section" in calls
+        assert portfolio["hero"]["tagline"] == TAGLINE
+        assert portfolio["bio"] == BIO.strip()
+
+    @pytest.mark.asyncio
+    async def test_refusal_aborts_the_stream_early(self, agent):
+        """A response that opens with a refusal fails before the rest is read."""
+        consumed = []
+        closed = []
+
+        async def fake_stream(prompt, config=None):
+            try:
+                for part in ["I'm sorry, ", "but I can't help with that.", " More text."]:
+                    consumed.append(part)
+                    yield part
+            finally:
+                closed.append(True)
+
+        agent._stream_content = fake_stream
+        with pytest.raises(GenerationError, match="declined"):
+            await agent._generate_content_async("p")
+
+        assert len(consumed) == 1
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_failed_validation_uses_one_retry_budget(self, agent, monkeypatch):
+        """
+        Scenario: Every tagline the model returns is too short.
+        Expected: max_retries calls in total (no nested retry loops), then the error is raised.
+        """
+        monkeypatch.setattr(GenerationAgent._generate_hero.retry, "wait", wait_none())
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(prompt)
+            return "Too short"
+
+        agent._generate_content_async = fake_generate
+        ctx = _GenerationContext.from_inputs(USER_DATA, "software_engineering")
+        with pytest.raises(ContentValidationError):
+            await agent._generate_hero_safe({"name": "Arjun"}, ctx, {})
+
+        assert len(calls) == agent.config.max_retries
+
+    def test_agents_share_memoized_request_configs(self, agent):
+        """Agents with equal sampling settings reuse one config object per mode."""
+        other = GenerationAgent({"enable_cache": False})
+
+        assert other.generation_config is agent.generation_config
+        assert other.json_generation_config is agent.json_generation_config
+        assert agent.json_generation_config.response_mime_type == "application/json"
+        assert GenerationAgent({"temperature": 0.2}).generation_config is not agent.generation_config
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_generation(self):
+        """Concurrent misses on one key run the factory once; failures are not cached."""
+        cache = ContentCache(ttl=60)
+        calls = []
+
+        async def factory():
+            calls.append(True)
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache.get_or_create("key", factory) for _ in range(3)))
+
+        assert results == ["value"] * 3
+        assert calls == [True]
+        assert await cache.get("key") == "value"
+
+        async def failing():
+            raise GenerationError("failed")
+
+        with pytest.raises(GenerationError):
+            await cache.get_or_create("bad", failing)
+        assert await cache.get("bad") is None
+
+    @pytest.mark.asyncio
+    async def test_get_or_create_waiters_retry_after_leader_cancelled(self):
+        """Cancelling the caller that is generating a key doesn't cancel the callers waiting on it."""
+        cache = ContentCache(ttl=60)
+        calls = []
+
+        async def factory():
+            calls.append(True)
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+            return "value"
+
+        leader = asyncio.create_task(cache.get_or_create("key", factory))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_create("key", factory))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == "value"
+        assert leader.cancelled()
+        assert len(calls) == 2
+
+    def test_generation_context_reads_user_data_once(self):
+        """The prompt fields are sliced and stringified up front."""
+        user_data = {"name": "Arjun", "skills": ["Python", "Go", 3, "Rust", "SQL", "Docker"], "projects": [{}, {}]}
+        ctx = _GenerationContext.from_inputs(user_data, "data_science")
+
+        assert ctx.skills == ("Python", "Go", "3", "Rust", "SQL", "Docker")
+        assert ctx.top_skills == ("Python", "Go", "3", "Rust", "SQL")
+        assert ctx.project_count == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_reports_elapsed_duration(self, agent):
+        """generation_duration is wall-clock time for the whole call, in seconds."""
+        async def no_combined(*args, **kwargs):
+            return {}
+
+        async def slow_section(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return {"name": "Arjun", "tagline": TAGLINE}
+
+        agent._generate_all_safe = no_combined
+        agent._generate_hero_safe = slow_section
+        agent._generate_bio_safe = slow_section
+        agent._generate_projects_safe = slow_section
+
+        portfolio = await agent.generate(SCHEMA, USER_DATA)
+
+        assert 0.02 <= portfolio["metadata"]["generation_duration"] < 1
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_cache_keys_ignore_mapping_order(self, monkeypatch, use_orjson):
+        """Keys are canonical with and without orjson installed."""
+        if not use_orjson:
+            monkeypatch.setattr(generation_agent, "orjson", None)
+        key = ContentCache._generate_key
+
+        assert key("hero", {"b": 1, "a": [2]}) == key("hero", {"a": [2], "b": 1})
+        assert key("hero", ("a", "b")) == key("hero", ["a", "b"])
+        assert key("hero", "a") != key("bio", "a")
+
+    @pytest.mark.asyncio
+    async def test_generate_many_keeps_job_order(self, agent):
+        """Without the batch API each job runs through the live path; results line up with jobs."""
+        async def fake_generate(prompt, config=None, timeout=None):
+            await asyncio.sleep(0.01 if "Arjun" in prompt else 0)
+            name = "Arjun" if "Arjun" in prompt else "Meera"
+            return json.dumps({"tagline": f"{name} builds reliable cloud systems for product teams", "bio": BIO})
+
+        agent._generate_content_async = fake_generate
+        jobs = [
+            ({**SCHEMA, "projects": []}, USER_DATA),
+            ({**SCHEMA, "hero": {"name": "Meera"}, "projects": []}, {"name": "Meera", "skills": ["Go"]}),
+        ]
+        portfolios = await agent.generate_many(jobs)
+
+        assert [p["hero"]["tagline"].split()[0] for p in portfolios] == ["Arjun", "Meera"]
+
+    def test_domain_context_is_specialized_once(self):
+        """The domain is filled in once per (template, domain); braces in it stay literal."""
+        template = "Domain: {domain}\nName: {name}"
+        specialized = _domain_context(template, "data_science")
+
+        assert specialized == "Domain: data science\nName: {name}"
+        assert _domain_context(template, "data_science") is specialized
+        assert _domain_context(template, "odd{x}").format(name="Arjun") == "Domain: odd{x}\nName: Arjun"
+
+    @pytest.mark.asyncio
+    async def test_deadline_closes_a_stalled_stream(self, agent):
+        """A call past its deadline raises TimeoutError after closing the stream."""
+        closed = []
+
+        async def stalled_stream(prompt, config=None):
+            try:
+                yield "Building"
+                await asyncio.sleep(5)
+                yield " more"
+            finally:
+                closed.append(True)
+
+        agent._stream_content = stalled_stream
+        with pytest.raises(asyncio.TimeoutError):
+            await agent._generate_content_async("p", timeout=0.05)
+
+        assert closed == [True]
+
+    @pytest.mark.asyncio
+    async def test_regeneration_prompts_share_a_static_prefix(self, agent):
+        """Regeneration and full-portfolio prompts open with fixed text; request fields come last."""
+        prompts = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            prompts.append(prompt)
+            return BIO
+
+        agent._generate_content_async = fake_generate
+        for name in ("Arjun", "Meera"):
+            context = {"user_profile": {"name": name, "skills": ["Python"]}, "current_content": BIO}
+            await agent.regenerate_section("bio", context, {"tone": "casual"})
+
+        assert all(prompt.startswith(_REGEN_BIO_PROMPT_PREFIX) for prompt in prompts)
+        assert "Name: Meera" in prompts[1]
+
+        schema_prompt = agent._build_prompt({"hero": {"name": "Arjun"}}, USER_DATA)
+        assert schema_prompt.startswith(_SCHEMA_PROMPT_PREFIX)
+        assert schema_prompt.endswith("Generate the JSON now.")
+
+    def test_extract_json_stops_where_the_value_ends(self, agent):
+        """Trailing prose or fences are ignored; unparsable text falls back to the outer braces."""
+        text = 'Sure! ```json\n{"a": "}", "b": [1]}\n``` Hope this helps {x}'
+
+        assert agent._extract_json(text) == '{"a": "}", "b": [1]}'
+        assert agent._extract_json("prefix {not json} suffix") == "{not json}"
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_compact_json_matches_across_backends(self, monkeypatch, use_orjson):
+        """Prompt JSON has no indentation and keeps non-ASCII text as-is."""
+        if not use_orjson:
+            monkeypatch.setattr(generation_agent, "orjson", None)
+
+        assert _compact_json({"name": "Zoë", "skills": ["Python", "Go"]}) == '{"name":"Zoë","skills":["Python","Go"]}'
+
+    def test_clean_bio_strips_markdown_emphasis(self, agent):
+        """Emphasis markers go and whitespace runs collapse to single spaces."""
+        assert agent._clean_bio("I **build**  *reliable*\n\nsystems.") == "I build reliable systems."
+        assert agent._clean_description("Built a ***fast***\tcache.") == "Built a fast cache."
+
+    @pytest.mark.asyncio
+    async def test_agents_share_one_limiter_per_loop(self, agent):
+        """RPM/TPM budgets belong to the API key, so equal limits share one limiter."""
+        other = GenerationAgent({"enable_cache": False})
+
+        assert other.rate_limiter is agent.rate_limiter
+        assert GenerationAgent({"requests_per_minute": 10}).rate_limiter is not agent.rate_limiter
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_paces_tokens_and_caps_calls_in_flight(self, monkeypatch):
+        """A spent TPM budget delays the next call; slot() never exceeds max_concurrent."""
+        waits = []
+        real_sleep = asyncio.sleep
+
+        async def recording_sleep(delay):
+            waits.append(delay)
+            await real_sleep(delay)
+
+        monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+        await limiter.acquire(tokens=600)
+        await limiter.acquire(tokens=1)
+        assert len(waits) == 1 and 0 < waits[0] <= 0.1
+
+        limiter = RateLimiter(requests_per_minute=6000, max_concurrent=2)
+        running = []
+        peak = []
+
+        async def call():
+            async with limiter.slot():
+                running.append(True)
+                peak.append(len(running))
+                await real_sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*(call() for _ in range(5)))
+        assert max(peak) == 2
+
+    @pytest.mark.asyncio
+    async def test_regenerate_sections_keeps_order_and_failures(self, agent):
+        """Results line up with the request; one failed section doesn't discard the rest."""
+        async def fake_regenerate(section, context, preferences=None):
+            await asyncio.sleep(0.01 if section == "bio" else 0)
+            if section == "project.p2":
+                raise GenerationError("failed")
+            return f"new {section}"
+
+        agent.regenerate_section = fake_regenerate
+        results = await agent.regenerate_sections([("bio", {}), ("hero", {}), ("project.p2", {})])
+
+        assert results[:2] == ["new bio", "new hero"]
+        assert isinstance(results[2], GenerationError)
+
+    @pytest.mark.asyncio
+    async def test_repeated_regeneration_is_not_cached(self, monkeypatch):
+        """Even with the cache on, regenerating the same section again asks the model again."""
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        agent = GenerationAgent({"generation_timeout": 5})
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(prompt)
+            return BIO
+
+        agent._generate_content_async = fake_generate
+        context = {"user_profile": {"name": "Arjun"}, "current_content": BIO}
+        first = await agent.regenerate_section("bio", context, {"tone": "casual"})
+        second = await agent.regenerate_section("bio", context, {"tone": "casual"})
+
+        assert first == second == BIO.strip()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_yields_in_completion_order(self, agent):
+        """
+        Scenario: Sections finish at different times and the consumer stops early.
+        Expected: Sections arrive as they complete; closing cancels the rest.
+        """
+        cancelled = []
+
+        async def combined(*args):
+            return {"bio": BIO}
+
+        async def hero(*args):
+            await asyncio.sleep(0.01)
+            return {"name": "Arjun", "tagline": TAGLINE}
+
+        async def projects(*args, **kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        agent._generate_all_safe = combined
+        agent._generate_hero_safe = hero
+        agent._generate_projects_safe = projects
+
+        seen = []
+        stream = agent.generate_stream(SCHEMA, USER_DATA)
+        async with contextlib.aclosing(stream):
+            async for name, _ in stream:
+                seen.append(name)
+                if name == "hero":
+                    break
+        await asyncio.sleep(0)
+
+        assert seen == ["bio", "hero"]
+        assert cancelled == [True]
+
+    @pytest.mark.asyncio
+    async def test_json_mode_rejects_non_json_early(self, agent):
+        """A JSON-mode stream that opens with prose fails before it is fully read."""
+        consumed = []
+
+        async def fake_stream(prompt, config):
+            for part in ["Sure", " here is {}", " more"]:
+                consumed.append(part)
+                yield part
+
+        agent._stream_content = fake_stream
+        with pytest.raises(GenerationError, match="not JSON"):
+            await agent._generate_content_async("p", agent.json_generation_config)
+        assert len(consumed) < 3
+
+    @pytest.mark.asyncio
+    async def test_json_mode_rejects_truncated_response(self, agent):
+        async def fake_stream(prompt, config):
+            for part in ['{"tagline": ', '"cut']:
+                yield part
+
+        agent._stream_content = fake_stream
+        with pytest.raises(GenerationError, match="Truncated"):
+            await agent._generate_content_async("p", agent.json_generation_config)
+
+    @pytest.mark.asyncio
+    async def test_duplicate_regenerations_share_one_call(self, agent):
+        """Concurrent identical requests make one call."""
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(prompt)
+            await asyncio.sleep(0.01)
+            return BIO
+
+        agent._generate_content_async = fake_generate
+        context = {"user_profile": {"name": "Arjun"}, "current_content": BIO}
+        results = await asyncio.gather(*(agent.regenerate_section("bio", context, {}) for _ in range(3)))
+
+        assert results == [BIO.strip()] * 3
+        assert len(calls) == 1
+
+    def test_retry_wait_honours_retry_after(self):
+        """A server-provided retry delay replaces the exponential backoff (capped)."""
+        class _Outcome:
+            def __init__(self, error):
+                self._error = error
+
+            def exception(self):
+                return self._error
+
+        class _State:
+            attempt_number = 1
+
+            def __init__(self, error):
+                self.outcome = _Outcome(error)
+
+        assert 4.0 <= _wait_before_retry(_State(RateLimitError("429", retry_after=4.0))) < 5.0
+        assert _wait_before_retry(_State(RateLimitError("429", retry_after=600))) <= 61.0
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_halve_the_concurrency_cap(self):
+        """AIMD: a 429 halves the cap, each success adds one back, up to max_concurrent."""
+        limiter = RateLimiter(requests_per_minute=6000, max_concurrent=4)
+
+        with pytest.raises(RateLimitError):
+            async with limiter.slot():
+                raise RateLimitError("429")
+        assert limiter._concurrency == 2
+
+        for _ in range(3):
+            async with limiter.slot():
+                pass
+        assert limiter._concurrency == 4
+
+    def test_accept_tagline_trims_instead_of_regenerating(self, agent):
+        """Overlong taglines are cut to the word limit without a dangling connective."""
+        long_tagline = TAGLINE + " and data platforms that help product teams ship faster with confidence"
+
+        assert agent._accept_tagline(TAGLINE) == TAGLINE
+        trimmed = agent._accept_tagline(long_tagline)
+        assert trimmed is not None
+        assert len(trimmed.split()) <= agent.config.hero_max_words
+        assert trimmed.split()[-1].lower() not in {"and", "that", "with"}
+        assert agent._accept_tagline("Too short") is None
+
+    def test_regeneration_context_from_context(self):
+        """Missing profile fields become None and skills become prompt-ready strings."""
+        ctx = _RegenerationContext.from_context({
+            "user_profile": {"name": "Arjun", "skills": ["Python", 3]},
+            "current_content": {"tagline": TAGLINE},
+        })
+
+        assert ctx.name == "Arjun"
+        assert ctx.title is None
+        assert ctx.skills == ("Python", "3")
+        assert ctx.current == {"tagline": TAGLINE}
+        assert _RegenerationContext.from_context({}).skills == ()
+
+    @pytest.mark.asyncio
+    async def test_rejected_request_is_not_retried(self, agent):
+        """A 4xx rejection reaches the caller unwrapped, after a single attempt."""
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(prompt)
+            raise RequestRejectedError("Request rejected (400): bad")
+
+        agent._generate_content_async = fake_generate
+        ctx = _GenerationContext.from_inputs(USER_DATA, "software_engineering")
+        with pytest.raises(RequestRejectedError):
+            await agent._generate_hero({"name": "Arjun"}, ctx, {})
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_combined_call_shares_the_section_cache(self, monkeypatch):
+        """
+        Scenario: generate() runs twice with the cache on, then a per-section call follows.
+        Expected: Only the first combined request reaches the model; the rest are cache hits.
+        """
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        agent = GenerationAgent({"generation_timeout": 5})
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(config is agent.json_generation_config)
+            return json.dumps({
+                "tagline": TAGLINE,
+                "bio": BIO,
+                "projects": [{"id": "p1", "description": DESCRIPTION}],
+            })
+
+        agent._generate_content_async = fake_generate
+        first = await agent.generate(SCHEMA, USER_DATA)
+        second = await agent.generate(SCHEMA, USER_DATA)
+        ctx = _GenerationContext.from_inputs(USER_DATA, "software_engineering")
+        bio = await agent._generate_bio_safe(SCHEMA["bio"], ctx, {})
+
+        assert calls == [True]
+        assert second["projects"] == first["projects"]
+        assert bio == first["bio"] == BIO.strip()
+
+    @pytest.mark.asyncio
+    async def test_combined_call_retries_rate_limit(self, agent):
+        """
+        Scenario: The combined request is rate limited once.
+        Expected: It is retried after retry_after instead of failing generate().
+        """
+        calls = []
+
+        async def fake_generate(prompt, config=None, timeout=None):
+            calls.append(config is agent.json_generation_config)
+            if len(calls) == 1:
+                raise RateLimitError("429", retry_after=0.0)
+            return json.dumps({
+                "tagline": TAGLINE,
+                "bio": BIO,
+                "projects": [{"id": "p1", "description": DESCRIPTION}],
+            })
+
+        agent._generate_content_async = fake_generate
+        portfolio = await agent.generate(SCHEMA, USER_DATA)
+
+        assert calls == [True, True]
+        assert portfolio["hero"]["tagline"] == TAGLINE
+
+    def test_client_is_built_per_loop_and_closed_on_shutdown(self, agent):
+        """
+        Scenario: The same (cached) agent is used from two event loops.
+        Expected: Each loop gets its own pool; close_http_clients() closes it
+        and the next call on that loop opens a fresh one.
+        """
+        async def use_client():
+            client = agent.client
+            assert agent.client is client
+            pool = _shared_http_client(agent.config.generation_timeout)
+            await close_http_clients()
+            assert pool.is_closed
+            assert agent.client is not client
+            await close_http_clients()
+            return pool
+
+        first = asyncio.run(use_client())
+        second = asyncio.run(use_client())
+
+        assert first is not second
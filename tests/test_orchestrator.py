@@ -0,0 +1,90 @@
+import pytest
+import json
+import sys
+import os
+
+# ------------------- PATH FIX -------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+agents_path = os.path.join(current_dir, "../agents")
+sys.path.insert(0, agents_path)
+# ------------------------------------------------
+
+from agents.orchestrator import PortfolioOrchestrator, get_orchestrator
+from agents.validation.input import InputValidationError
+
+
+class TestGetOrchestrator:
+
+    @pytest.fixture(autouse=True)
+    def api_key(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+
+    @pytest.mark.asyncio
+    async def test_none_and_empty_config_share_instance(self):
+        """Scenario: No config vs an empty config. Expected: the same cached orchestrator."""
+        orchestrator = await get_orchestrator(None)
+
+        assert isinstance(orchestrator, PortfolioOrchestrator)
+        assert orchestrator is await get_orchestrator({})
+
+    @pytest.mark.asyncio
+    async def test_configs_compare_by_content(self):
+        """Scenario: Equal configs built separately. Expected: shared; different configs are not."""
+        first = await get_orchestrator({"generation": {"temperature": 0.5}})
+
+        assert first is await get_orchestrator({"generation": {"temperature": 0.5}})
+        assert first is not await get_orchestrator({"generation": {"temperature": 0.9}})
+
+
+class TestPortfolioOrchestrator:
+
+    @pytest.fixture
+    def orchestrator(self, monkeypatch):
+        monkeypatch.setenv("GEMINI_API_KEY", "fake_key_for_testing")
+        return PortfolioOrchestrator()
+
+    @pytest.mark.asyncio
+    async def test_run_checks_input_before_any_stage(self, orchestrator):
+        """Scenario: No content keys. Expected: InputValidationError, unwrapped, before preprocessing."""
+        async def preprocess(data):
+            raise AssertionError("preprocessor should not run")
+
+        orchestrator.preprocessor.preprocess = preprocess
+
+        with pytest.raises(InputValidationError, match="'summary'"):
+            await orchestrator.run({"name": "Arjun", "skills": []})
+
+    @pytest.mark.asyncio
+    async def test_regenerate_section_replaces_one_project(self, orchestrator):
+        """Scenario: Regenerate projects.1. Expected: only that project changes, on a copy."""
+        portfolio = {
+            "hero": {"name": "Arjun", "tagline": "Old"},
+            "skills": ["Python"],
+            "projects": [{"title": "A"}, {"title": "B", "description": "old"}],
+        }
+        seen = {}
+
+        async def fake_regenerate(section, context, preferences=None):
+            seen.update(section=section, context=context)
+            return {**context["current_content"], "description": "new"}
+
+        orchestrator.generator.regenerate_section = fake_regenerate
+        updated = await orchestrator.regenerate_section(portfolio, "projects.1")
+
+        assert seen["context"]["user_profile"]["name"] == "Arjun"
+        assert updated["projects"] == [{"title": "A"}, {"title": "B", "description": "new"}]
+        assert portfolio["projects"][1]["description"] == "old"
+        assert "last_updated" in updated["metadata"]
+
+        with pytest.raises(ValueError):
+            await orchestrator.regenerate_section(portfolio, "projects.5")
+
+    @pytest.mark.asyncio
+    async def test_export_portfolio_formats(self, orchestrator):
+        """Scenario: Export as JSON and HTML. Expected: key order kept, markup escaped."""
+        portfolio = {"hero": {"name": "<Arjun>"}, "bio": "Hi"}
+
+        assert json.loads(await orchestrator.export_portfolio(portfolio)) == portfolio
+        assert "&lt;Arjun&gt;" in await orchestrator.export_portfolio(portfolio, "html_preview")
+        with pytest.raises(ValueError):
+            await orchestrator.export_portfolio(portfolio, "pdf")
@@ -14,7 +14,7 @@ sys.path.insert(0, agents_path)
 
 from agno.run import RunContext
 # Adjust import path as necessary
-from agents.core.template_selector_agent import TemplateSelectorAgent
+from agents.core.template_selector_agent import TemplateSelectorAgent, _CriteriaMatcher
 
 class TestTemplateSelectorAgent:
 
@@ -42,18 +42,14 @@ class TestTemplateSelectorAgent:
 
     # --- Fixture 2: Initialized Agent with Fake File ---
     @pytest.fixture
-    def agent(self, mock_registry_json):
+    def agent(self, mock_registry_json, tmp_path):
         """
-        Initializes agent but tricks it into reading our fake JSON string
-        instead of a real file on disk.
+        Initializes agent from our fake JSON string, written to a temporary
+        registry file.
         """
-        # We mock Path.exists to return True
-        # We mock Path.read_text to return our JSON string
-        with patch("pathlib.Path.exists", return_value=True), \
-             patch("pathlib.Path.read_text", return_value=mock_registry_json):
-            
-            # Initialize with a dummy path; the mock handles the rest
-            return TemplateSelectorAgent(registry_path="dummy_registry.json")
+        registry_file = tmp_path / "dummy_registry.json"
+        registry_file.write_text(mock_registry_json, encoding="utf-8")
+        return TemplateSelectorAgent(registry_path=registry_file)
 
     @pytest.mark.asyncio
     async def test_run_flow_success(self, agent):
@@ -94,25 +90,100 @@ class TestTemplateSelectorAgent:
         with pytest.raises(ValueError, match="profile` missing"):
             await agent.run(ctx)
 
-    def test_init_raises_error_if_file_missing(self):
+    def test_init_raises_error_if_file_missing(self, tmp_path):
         """
         Scenario: Registry file does not exist.
         Expected: FileNotFoundError.
         """
-        # Patch exists() to return False
-        with patch("pathlib.Path.exists", return_value=False):
-            with pytest.raises(FileNotFoundError, match="Template registry not found"):
-                TemplateSelectorAgent(registry_path="missing_file.json")
+        with pytest.raises(FileNotFoundError, match="Template registry not found"):
+            TemplateSelectorAgent(registry_path=tmp_path / "missing_file.json")
 
-    def test_init_raises_error_on_bad_json(self):
+    def test_init_raises_error_on_bad_json(self, tmp_path):
         """
         Scenario: Registry file exists but contains broken JSON.
         Expected: ValueError (wrapping the JSONDecodeError).
         """
-        bad_json_content = "{ 'broken': " # Missing closing brace
-        
-        with patch("pathlib.Path.exists", return_value=True), \
-             patch("pathlib.Path.read_text", return_value=bad_json_content):
-             
-            with pytest.raises(ValueError, match="Invalid JSON"):
-                TemplateSelectorAgent(registry_path="bad_file.json")
\ No newline at end of file
+        bad_file = tmp_path / "bad_file.json"
+        bad_file.write_text("{ 'broken': ", encoding="utf-8") # Missing closing brace
+
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            TemplateSelectorAgent(registry_path=bad_file)
+
+    def test_select_template_role_priority_follows_registry_order(self, tmp_path):
+        """
+        Scenario: Role string contains several byRole keys.
+        Expected: The key listed first in registry.json wins, regardless of
+        where it appears in the role string.
+        """
+        registry = json.dumps({
+            "templates": [
+                {"id": "dev_temp", "name": "Dev"},
+                {"id": "stack_temp", "name": "Stack"},
+                {"id": "tech_temp", "name": "Tech"},
+            ],
+            "selectionCriteria": {
+                "byRole": {
+                    "developer": ["dev_temp"],
+                    "full-stack": ["stack_temp"],
+                },
+                "byIndustry": {"tech": ["tech_temp"]},
+            },
+            "aiSelectionGuidelines": {"fallback": "dev_temp"},
+        })
+
+        registry_file = tmp_path / "priority_registry.json"
+        registry_file.write_text(registry, encoding="utf-8")
+        agent = TemplateSelectorAgent(registry_path=registry_file)
+
+        assert agent._select_template({"role": "Full-Stack Developer"})["id"] == "dev_temp"
+        assert agent._select_template({"role": "Full-Stack Engineer"})["id"] == "stack_temp"
+        assert agent._select_template({"role": "Engineer", "industry": "FinTech"})["id"] == "tech_temp"
+
+    def test_criteria_matcher_role_key_does_not_shadow_industry_key(self):
+        """
+        Scenario: A byRole key is a prefix of a byIndustry key, and only the
+        industry text contains it.
+        Expected: The industry key still matches.
+        """
+        matcher = _CriteriaMatcher({"data": ["a"]}, {"data science": ["b"]})
+
+        assert matcher.match("nurse", "data science") == (1, "data science", ("b",))
+        assert matcher.match("data analyst", "data science") == (0, "data", ("a",))
+        assert matcher.match("nurse", "retail") is None
+
+    def test_selected_template_is_a_copy_of_the_cached_registry(self, tmp_path):
+        """
+        Scenario: A caller mutates the template it was handed.
+        Expected: Later selections (from any agent on the same registry) are unaffected.
+        """
+        registry = json.dumps({
+            "templates": [{"id": "dev_temp", "name": "Dev", "sections": ["hero"]}],
+            "selectionCriteria": {"byRole": {"developer": ["dev_temp"]}},
+            "aiSelectionGuidelines": {"fallback": "dev_temp"},
+        })
+
+        registry_file = tmp_path / "copy_registry.json"
+        registry_file.write_text(registry, encoding="utf-8")
+        agent = TemplateSelectorAgent(registry_path=registry_file)
+        other = TemplateSelectorAgent(registry_path=registry_file)
+
+        template = agent._select_template({"role": "Developer"})
+        template["name"] = "Changed"
+        template["sections"].append("footer")
+
+        assert other._select_template({"role": "Developer"}) == {"id": "dev_temp", "name": "Dev", "sections": ["hero"]}
+        assert agent._select_template({"role": "nobody"})["name"] == "Dev"
+
+    def test_edited_registry_is_reparsed(self, tmp_path):
+        """
+        Scenario: registry.json changes after an agent has loaded it.
+        Expected: The next agent reads the new contents, not the cached parse.
+        """
+        registry_file = tmp_path / "registry.json"
+        registry_file.write_text(json.dumps({"templates": [{"id": "old"}]}), encoding="utf-8")
+        assert list(TemplateSelectorAgent(registry_path=registry_file).templates_map) == ["old"]
+
+        registry_file.write_text(json.dumps({"templates": [{"id": "new"}]}), encoding="utf-8")
+        os.utime(registry_file, ns=(0, registry_file.stat().st_mtime_ns + 1_000_000))
+
+        assert list(TemplateSelectorAgent(registry_path=registry_file).templates_map) == ["new"]
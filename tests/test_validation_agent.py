@@ -0,0 +1,54 @@
+import pytest
+import sys
+import os
+
+# ------------------- PATH FIX -------------------
+current_dir = os.path.dirname(os.path.abspath(__file__))
+agents_path = os.path.join(current_dir, "../agents")
+sys.path.insert(0, agents_path)
+# ------------------------------------------------
+
+from agents.validation.validation_agent import PortfolioValidator, ValidationError
+
+BIO = "I build data pipelines and my work keeps analytics fast. I enjoy hard problems."
+DESCRIPTION = "A streaming ingestion service that loads events into the warehouse within seconds."
+
+
+class TestPortfolioValidator:
+
+    @pytest.fixture
+    def validator(self):
+        return PortfolioValidator()
+
+    @pytest.mark.asyncio
+    async def test_validate_and_enhance_attaches_scores(self, validator):
+        """
+        Scenario: A clean portfolio.
+        Expected: Per-section scores, the overall score and consistency warnings are attached.
+        """
+        portfolio = {
+            "hero": {"name": "Arjun", "tagline": "Data engineer building fast and reliable analytics pipelines"},
+            "bio": BIO,
+            "projects": [{"title": "Ingest", "description": DESCRIPTION, "technologies": ["Kafka"]}],
+        }
+
+        result = await validator.validate_and_enhance(portfolio, {"name": "Arjun", "projects": [{}]})
+
+        assert result["quality_score"] == 1.0
+        assert result["validation"]["projects_score"] == 1.0
+        assert result["validation"]["warnings"] == []
+
+    @pytest.mark.asyncio
+    async def test_validate_and_enhance_rejects_low_scores(self, validator):
+        """
+        Scenario: Placeholder tagline, third-person bio and a placeholder project.
+        Expected: ValidationError, since the overall score is below PASS_SCORE.
+        """
+        portfolio = {
+            "hero": {"name": "Arjun", "tagline": "[Your tagline here]"},
+            "bio": "Arjun builds pipelines. Arjun builds pipelines.",
+            "projects": [{"title": "Ingest", "description": "TODO"}],
+        }
+
+        with pytest.raises(ValidationError, match="below threshold"):
+            await validator.validate_and_enhance(portfolio, {"name": "Arjun"})